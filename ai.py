@@ -1,61 +1,149 @@
 import math
+import os
 import random
 import sys
+import threading
+import time
 from board import Board
+from book import OpeningBook
 from config import *
-
-class Node:
-    """Represents a node in the MCTS tree."""
-    
-    def __init__(self, board, parent=None, action=None, color=""):
-        """Initialize a new MCTS node."""
-        self.visits = 0  # Visit count
-        self.reward = 0.0  # Win count
-        self.board = board  # Board state
-        self.children = []  # Child nodes
-        self.parent = parent  # Parent node
-        self.action = action  # Action that led to this state
-        self.color = color  # Player color for this node
-    
-    def get_ucb(self):
-        """Calculate the UCB (Upper Confidence Bound) value of this node."""
-        if self.visits == 0:
-            return sys.maxsize  # Unvisited nodes have max UCB
-        
-        # UCB formula: Q(s,a) + c * sqrt(ln(N(s)) / N(s,a))
-        exploration = math.sqrt(2.0 * math.log(self.parent.visits) / float(self.visits))
-        exploitation = self.reward / self.visits
-        return exploitation + exploration
-    
-    def add_child(self, board, action, color):
-        """Add a child node to this node."""
-        child_node = Node(board, parent=self, action=action, color=color)
-        self.children.append(child_node)
-    
-    def is_fully_expanded(self):
-        """Check if all possible child nodes have been visited at least once."""
-        if not self.children:
-            return False
-            
-        for child in self.children:
-            if child.visits == 0:
-                return False
-                
-        return True
+from playout import POLICIES, run_playout
+from search_stats import SearchStats, PHASES
+from solver import EndgameSolver
+from transposition import TranspositionTable
+from tree import NodeStore, COLOR_INDEX, COLORS, NO_NODE, move_to_square, square_to_move
+from zobrist import ZOBRIST_SIDE
 
 
 class MCTSAI:
-    """AI player using Monte Carlo Tree Search algorithm."""
+    """
+    AI player using Monte Carlo Tree Search algorithm.
     
-    def __init__(self, difficulty, player_color):
-        """Initialize the AI with the specified difficulty."""
+    The search tree lives in a struct-of-arrays NodeStore: nodes are integer
+    IDs and the select / expand / backpropagate phases work directly on its
+    typed arrays. With the transposition table a node can be reached from
+    several parents, so the search keeps the path it descended.
+    """
+    
+    def __init__(self, difficulty, player_color, playouts_per_leaf=PLAYOUTS_PER_LEAF,
+                 playout_policy=PLAYOUT_POLICY, playout_cutoff=PLAYOUT_CUTOFF,
+                 workers=WORKERS, search_mode=SEARCH_MODE, parallel_batch=PARALLEL_BATCH,
+                 reuse_tree=REUSE_TREE, time_limit_ms=TIME_LIMIT_MS,
+                 transposition_size=TRANSPOSITION_SIZE, widening_coeff=WIDENING_COEFF,
+                 widening_exponent=WIDENING_EXPONENT, root_choice=ROOT_CHOICE,
+                 rave_equivalence=RAVE_EQUIVALENCE, solver_empties=SOLVER_EMPTIES,
+                 book_path=BOOK_PATH, book_min_visits=BOOK_MIN_VISITS, verbose=VERBOSE,
+                 stats_path=STATS_PATH, cancel_event=None, max_nodes=MAX_TREE_NODES, seed=None):
+        """
+        Initialize the AI with the specified difficulty.
+        
+        Args:
+            difficulty: Number of MCTS iterations per move
+            player_color: The human player's color
+            playouts_per_leaf: Playouts per leaf evaluation; from
+                BATCH_PLAYOUT_MIN on they are played in lockstep by the NumPy
+                batch playout engine (uniformly random and to the end of the
+                game), smaller counts one after the other
+            playout_policy: Move choice in playouts, a name in playout.POLICIES
+            playout_cutoff: Plies after which a playout stops and is scored
+                by the static evaluation (0 = play to the end)
+            workers: Number of worker processes used when above 1
+            search_mode: 'root' runs an independent search per worker and
+                merges their root statistics; 'tree' grows one shared tree
+                and sends batches of leaves to the workers for playouts
+            parallel_batch: Leaves collected per batch in 'tree' mode
+            reuse_tree: Keep the search tree between moves and continue from
+                the subtree matching the opponent's reply
+            time_limit_ms: Optional wall-clock budget per move; when set it
+                replaces the iteration count, the most visited move is played
+                whatever root_choice says, and the search may stop early once
+                that move can no longer be overtaken
+            transposition_size: Maximum number of positions in the transposition
+                table that lets transposed positions share one node (0 = off)
+            widening_coeff, widening_exponent: Progressive widening; a node with
+                N visits selects among its first int(coeff * N ** exponent) + 1
+                moves in SQUARE_WEIGHTS order (coeff 0 = all moves at once)
+            root_choice: How the move is picked after the search: 'ucb' (highest
+                UCB value), 'visits' (most visited) or 'mean' (best mean reward)
+            rave_equivalence: Enables RAVE when above 0; selection blends each
+                move's AMAF value in with weight sqrt(k / (3N + k)) for k =
+                rave_equivalence and N parent visits
+            solver_empties: Positions with at most this many empty squares are
+                solved exactly by the endgame solver instead of MCTS (0 = never)
+            book_path: Opening book file (None or a missing file = no book)
+            book_min_visits: Book positions with at least this many visits are
+                played at once; smaller entries seed the root statistics
+            verbose: Print the statistics of every search
+            stats_path: Optional file that each search's statistics are
+                appended to as one JSON line
+            cancel_event: Optional threading / multiprocessing Event; once set,
+                the running search stops at its next iteration
+            max_nodes: Node budget of the tree (0 = unlimited); reaching it
+                prunes the least visited subtrees down to PRUNE_FRACTION of it
+            seed: Optional seed for the search's random number generator
+        """
         self.difficulty = difficulty
         self.player_color = player_color
         self.ai_color = WHITE_TILE if player_color == BLACK_TILE else BLACK_TILE
+        self.playouts_per_leaf = playouts_per_leaf
+        self.playout_policy = playout_policy
+        self.playout_cutoff = playout_cutoff
+        if playout_policy not in POLICIES:
+            raise ValueError("unknown playout policy %r" % playout_policy)
+        self._policy = POLICIES[playout_policy]()
+        self.workers = workers
+        self.search_mode = search_mode
+        self.parallel_batch = parallel_batch
+        self.reuse_tree = reuse_tree
+        self.time_limit_ms = time_limit_ms
+        self.transposition = TranspositionTable(transposition_size) if transposition_size > 0 else None
+        self.widening_coeff = widening_coeff
+        self.widening_exponent = widening_exponent
+        self.root_choice = root_choice
+        self.rave_equivalence = rave_equivalence
+        self.solver_empties = solver_empties
+        self.solver = None
+        self.proven_score = None  # Disc difference proven by the last solved move
+        self.book_path = book_path
+        self.book_min_visits = book_min_visits
+        self.book = OpeningBook(book_path) if book_path and os.path.exists(book_path) else None
+        self.verbose = verbose
+        self.stats_path = stats_path
+        self.last_stats = None  # SearchStats of the most recent search
+        self.cancel_event = cancel_event
+        self.max_nodes = max_nodes
+        self.prunes = 0  # Totals over the lifetime of the AI
+        self.pruned_nodes = 0
+        self.store = NodeStore()
+        self._path = []  # Reused by _select in sequential search
+        self.rng = random.Random(seed)
         self.current_iteration = 0
+        self._phase_seconds = [0.0] * len(PHASES)
+        self._depth_total = 0
+        self._max_depth = 0
+        self._search_prunes = 0
+        self._search_pruned_nodes = 0
+        self._search_start = None
+        self._deadline = None
+        self._batch_playout = None
+        self._root_parallel = None
+        self._playout_pool = None
+        
+        # Subtree kept from the previous move and the position at its root
+        self._root = None
+        self._root_board = None
+        
+        # Background search during the opponent's turn
+        self._ponder_thread = None
+        self._ponder_stop = threading.Event()
     
     def get_progress(self):
         """获取当前搜索进度，返回0到1之间的值"""
+        if self.time_limit_ms is not None:
+            if self._deadline is None:  # No search running
+                return 1.0
+            elapsed = time.perf_counter() - self._search_start
+            return min(1.0, elapsed * 1000.0 / self.time_limit_ms) if self.time_limit_ms > 0 else 1.0
         if self.difficulty == 0:
             return 1.0
         return min(1.0, self.current_iteration / self.difficulty)
@@ -68,132 +156,796 @@ class MCTSAI:
             board: The current board state
             progress_callback: Optional callback function to report progress
         """
-        root = Node(board.get_copy(), None, None, self.player_color)
-        self.current_iteration = 0
+        return self.search(board, progress_callback)[0]
+    
+    def search(self, board, progress_callback=None):
+        """
+        Search the board and return the chosen move with its statistics.
         
-        # Run MCTS for the specified number of iterations
-        for i in range(self.difficulty):
-            self.current_iteration = i + 1
-            
-            # Selection phase: select a promising node
-            selected_node = self._select(root)
-            
-            # Expansion phase: expand the selected node
-            leaf_node = self._expand(selected_node)
-            
-            # Simulation phase: simulate a random game from the leaf node
-            reward = self._simulate(leaf_node)
-            
-            # Backpropagation phase: update statistics in the path
-            self._backpropagate(leaf_node, reward)
+        With at most solver_empties empty squares the move is solved exactly
+        instead, and its final disc difference is left in proven_score.
+        
+        Args:
+            board: The current board state
+            progress_callback: Optional callback function to report progress
+        
+        Returns:
+            (best action or None, SearchStats)
+        """
+        self._wait_for_ponder()
+        stats = SearchStats()
+        start = time.perf_counter()
+        
+        if board.get_empty_count() <= self.solver_empties:
+            best_action = self._solve(board, stats)
+        else:
+            self.proven_score = None
+            best_action = self._book_move(board, stats)
+            if best_action is None:
+                best_action = self._search_move(board, stats, progress_callback)
+        
+        stats.move = best_action
+        stats.seconds = time.perf_counter() - start
+        self.last_stats = stats
+        if self.verbose:
+            print(stats.format_table())
+        if self.stats_path:
+            with open(self.stats_path, 'a') as stats_file:
+                stats_file.write(stats.to_json() + '\n')
+        return best_action, stats
+    
+    def _search_move(self, board, stats, progress_callback):
+        """Run MCTS on the board, fill in stats and return the chosen action."""
+        if self.workers > 1 and self.search_mode == 'tree':
+            root = self._search_tree_parallel(board, progress_callback)
+        elif self.workers > 1:
+            root = self._search_root_parallel(board, progress_callback)
+        else:
+            root = self._search(board, progress_callback)
+        
+        store = self.store
+        
+        # Select the child that scores best under the root choice rule
+        best_edge = None
+        best_score = float('-inf')
+        
+        for edge in self._visited_edges(root):
+            child_score = self._root_score(store.edge_child[edge], root)
+            if best_score < child_score:
+                best_score = child_score
+                best_edge = edge
+        
+        self._fill_stats(stats, root)
+        
+        if best_edge is None:
+            self.reset_tree()
+            return None
+        
+        best_action = square_to_move(store.edge_move[best_edge])
+        if self.reuse_tree and not (self.workers > 1 and self.search_mode == 'root'):
+            self._keep_subtree(store.edge_child[best_edge], best_action, board)
+        
+        return best_action
+    
+    def _fill_stats(self, stats, root):
+        """Copy the measurements of the finished search and the tree below root into stats."""
+        store = self.store
+        stats.iterations = self.current_iteration
+        stats.playouts = stats.iterations * self.playouts_per_leaf
+        stats.phase_seconds = dict(zip(PHASES, self._phase_seconds))
+        stats.max_depth = self._max_depth
+        stats.mean_depth = self._depth_total / self.current_iteration if self.current_iteration else 0.0
+        stats.tree_nodes = len(store)
+        stats.tree_bytes = store.nbytes()
+        stats.prunes = self._search_prunes
+        stats.pruned_nodes = self._search_pruned_nodes
+        stats.root_children = [
+            (square_to_move(store.edge_move[edge]), store.visits[store.edge_child[edge]],
+             store.reward[store.edge_child[edge]])
+            for edge in self._visited_edges(root)
+        ]
+        
+        # Principal variation: follow the most visited child from the root
+        node = root
+        while True:
+            best_edge = max(self._visited_edges(node),
+                            key=lambda edge: store.visits[store.edge_child[edge]], default=None)
+            if best_edge is None:
+                break
+            stats.principal_variation.append(square_to_move(store.edge_move[best_edge]))
+            node = store.edge_child[best_edge]
+            if len(stats.principal_variation) >= BOARD_SIZE * BOARD_SIZE:
+                break  # Transpositions can only close a cycle by hash collision
+    
+    def get_root_stats(self, board):
+        """Run a search and return (action, visits, reward) for every root child."""
+        self._wait_for_ponder()
+        root = self._search(board)
+        self._root = None
+        store = self.store
+        stats = []
+        for edge in self._visited_edges(root):
+            child = store.edge_child[edge]
+            stats.append((square_to_move(store.edge_move[edge]), store.visits[child], store.reward[child]))
+        return stats
+    
+    def close(self):
+        """Stop pondering and shut down the worker processes used by parallel search."""
+        self._wait_for_ponder()
+        if self._root_parallel is not None:
+            self._root_parallel.close()
+            self._root_parallel = None
+        if self._playout_pool is not None:
+            self._playout_pool.close()
+            self._playout_pool = None
+    
+    def start_pondering(self, board):
+        """
+        Keep searching in a background thread while the opponent is to move.
+        
+        Args:
+            board: The current board, with the opponent (the human player) to move
+        """
+        if not self.reuse_tree:
+            return
+        if self.is_pondering() and not self._ponder_stop.is_set():
+            return  # Already pondering
+        self._wait_for_ponder()  # A thread asked to stop may still be finishing its iteration
+        if self.workers > 1 and self.search_mode == 'root':
+            return  # Root-parallel search keeps no tree to ponder on
+        if board.get_empty_count() <= self.solver_empties + 1:
+            return  # The reply will be solved exactly
+        
+        # Continue from the kept subtree if it is this position, else start fresh
+        if self._root is None or self._root_board.position_key() != board.position_key():
+            self.reset_tree()
+            self._root = self._new_root(board, self.ai_color)
+            self._root_board = board.get_copy()
+        
+        self._ponder_stop.clear()
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(self._root, self._root_board))
+        self._ponder_thread.daemon = True
+        self._ponder_thread.start()
+    
+    def stop_pondering(self):
+        """Ask the pondering thread to stop; returns immediately without waiting for it."""
+        self._ponder_stop.set()
+    
+    def is_pondering(self):
+        """Check whether the pondering thread is still running."""
+        return self._ponder_thread is not None and self._ponder_thread.is_alive()
+    
+    def _wait_for_ponder(self):
+        """Stop the pondering thread and wait until it has left the tree."""
+        if self._ponder_thread is not None:
+            self._ponder_stop.set()
+            self._ponder_thread.join()
+            self._ponder_thread = None
+    
+    def _ponder(self, root, root_board):
+        """Pondering thread: run MCTS iterations on the kept tree until asked to stop."""
+        board = root_board.get_copy()
+        root_depth = len(board.history)
+        while not self._ponder_stop.is_set():
+            if self.max_nodes and len(self.store) >= self.max_nodes:
+                root = self._root = self._prune(root)
+            self._run_iteration(root, board, root_depth)
+    
+    def _prune(self, root):
+        """Prune the tree down to PRUNE_FRACTION of the node budget and return the new root ID."""
+        root, removed = self.store.prune(root, int(self.max_nodes * PRUNE_FRACTION), self.transposition)
+        self.prunes += 1
+        self.pruned_nodes += removed
+        self._search_prunes += 1
+        self._search_pruned_nodes += removed
+        return root
+    
+    def _solve(self, board, stats):
+        """Pick the move with the endgame solver and record its proven score."""
+        if self.solver is None:
+            self.solver = EndgameSolver()
+        
+        # The kept tree cannot be continued once the solver has taken over
+        self.reset_tree()
+        best_action, self.proven_score = self.solver.solve(board.get_copy(), self.ai_color)
+        self.current_iteration = self.difficulty
+        
+        stats.source = 'solver'
+        stats.proven_score = self.proven_score
+        stats.solver_nodes = self.solver.nodes
+        if best_action is not None:
+            stats.principal_variation = [best_action]
+        return best_action
+    
+    def _book_move(self, board, stats):
+        """Return the book's move if the position has a complete book entry, else None."""
+        if self.book is None:
+            return None
+        booked = self.book.lookup(board, self.ai_color)
+        if sum(visits for _, visits, _ in booked) < self.book_min_visits:
+            return None
+        
+        best_action = max(booked, key=lambda stat: stat[1])[0]
+        if not board.is_valid_move(self.ai_color, best_action[0], best_action[1]):
+            return None  # Hash collision
+        
+        # The kept tree does not cover the book line
+        self.reset_tree()
+        self.current_iteration = self.difficulty
+        stats.source = 'book'
+        stats.root_children = booked
+        stats.principal_variation = [best_action]
+        return best_action
+    
+    def _seed_root(self, root, board):
+        """
+        Give an unexpanded root the statistics of a partial book entry.
+        
+        The booked moves become the root's first children, with their book
+        visits and rewards, so the search continues from the book's estimate.
+        """
+        store = self.store
+        if self.book is None or store.child_count[root]:
+            return
+        stats = self.book.lookup(board, self.ai_color)
+        valid_moves = board.get_valid_moves(self.ai_color)
+        booked = sorted((stat for stat in stats if stat[0] in valid_moves), key=lambda stat: -stat[1])
+        if not booked:
+            return
+        
+        booked_actions = [action for action, _, _ in booked]
+        others = sorted((action for action in valid_moves if action not in booked_actions),
+                        key=lambda action: -SQUARE_WEIGHTS[action[0]][action[1]])
+        actions = booked_actions + others
+        store.set_children(root, [move_to_square(action) for action in actions], [NO_NODE] * len(actions))
+        
+        first = store.first_child[root]
+        for edge, (action, visits, reward) in enumerate(booked, first):
+            board.make_move(self.ai_color, action[0], action[1])
+            child = self._materialize(root, edge, board, self.ai_color)
+            board.unmake_move()
+            store.visits[child] += visits
+            store.reward[child] += reward
+            store.visits[root] += visits
+            store.reward[root] -= reward
+        store.tried[root] = len(booked)
+    
+    def reset_tree(self):
+        """Forget the search tree kept from previous moves."""
+        self._root = None
+        self._root_board = None
+        self.store.clear()
+        if self.transposition is not None:
+            self.transposition.clear()
+    
+    def _keep_subtree(self, best_child, best_action, board):
+        """Keep the chosen child's subtree and the position it represents for the next move."""
+        self._root = self.store.compact(best_child, self.transposition)
+        self._root_board = board.get_copy()
+        self._root_board.make_move(COLORS[self.store.color[self._root]], best_action[0], best_action[1])
+    
+    def _get_root(self, board):
+        """
+        Return the root node for a search from board.
+        
+        Reuses the grandchild of the previous root that matches the opponent's
+        reply, with its statistics intact, or starts a fresh root otherwise.
+        """
+        root = self._root
+        self._root = None
+        if root is not None:
+            store = self.store
+            key = board.position_key()
+            for edge in self._visited_edges(root):
+                child = store.edge_child[edge]
+                x, y = square_to_move(store.edge_move[edge])
+                self._root_board.make_move(COLORS[store.color[child]], x, y)
+                matched = self._root_board.position_key() == key
+                self._root_board.unmake_move()
+                if matched:
+                    return store.compact(child, self.transposition)
+        
+        # Entries from an unrelated tree could only be shared by accident
+        self.reset_tree()
+        return self._new_root(board, self.player_color)
+    
+    def _new_root(self, board, color):
+        """Create a root node for board, where color has just moved."""
+        root = self.store.add_node(COLOR_INDEX[color])
+        if self.transposition is not None:
+            self.transposition.put(self._position_key(board, color), root)
+        return root
+    
+    def _position_key(self, board, color):
+        """Transposition key of board after color has moved (the opponent is to move)."""
+        return board.hash ^ ZOBRIST_SIDE[color]
+    
+    def _search(self, board, progress_callback=None):
+        """Run MCTS iterations from the given board and return the root node."""
+        # A single working board is walked down the tree and back up again
+        # with make_move / unmake_move, so nodes do not need their own boards
+        board = board.get_copy()
+        root_depth = len(board.history)
+        root = self._get_root(board)
+        self._seed_root(root, board)
+        self._start_budget()
+        
+        # Run MCTS until the iteration count or time budget is used up
+        while not self._budget_exhausted(root):
+            self.current_iteration += 1
+            if self.max_nodes and len(self.store) >= self.max_nodes:
+                root = self._prune(root)
+            self._run_iteration(root, board, root_depth)
             
             # 报告进度
-            if progress_callback and i % 10 == 0:  # 每10次迭代更新一次进度，避免过于频繁的UI更新
+            if progress_callback and self.current_iteration % 10 == 1:  # 每10次迭代更新一次进度，避免过于频繁的UI更新
                 progress_callback(self.get_progress())
         
-        # Select the child with the highest UCB
-        best_child = None
-        best_ucb = float('-inf')
+        self._deadline = None
+        return root
+    
+    def _start_budget(self):
+        """Reset the iteration counter and start the clock for a new search."""
+        self.current_iteration = 0
+        self._phase_seconds = [0.0] * len(PHASES)
+        self._depth_total = 0
+        self._max_depth = 0
+        self._search_prunes = 0
+        self._search_pruned_nodes = 0
+        self._search_start = time.perf_counter()
+        if self.time_limit_ms is not None:
+            self._deadline = self._search_start + self.time_limit_ms / 1000.0
+    
+    def _budget_exhausted(self, root):
+        """Check whether the search should stop before the next iteration."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            return True
+        if self.time_limit_ms is None:
+            return self.current_iteration >= self.difficulty
         
-        for child in root.children:
-            child_ucb = child.get_ucb()
-            if best_ucb < child_ucb:
-                best_ucb = child_ucb
-                best_child = child
+        now = time.perf_counter()
+        if now >= self._deadline:
+            return True
+        if self.current_iteration < 2 or self.current_iteration % EARLY_STOP_INTERVAL:
+            return False
         
-        # Print statistics for children
-        print("validmoves\trewards\tvisits")
-        for child in root.children:
-            print(child.action, '\t', ':', '\t', child.reward, '\t', child.visits)
-        print("--------------------------")
+        # Stop early once the most visited move cannot be overtaken even if
+        # every remaining iteration went to the runner-up; timed searches
+        # play the most visited move (see _root_score), so the result is final
+        store = self.store
+        if store.child_count[root] < 2:
+            return True
+        first = second = 0
+        for edge in self._visited_edges(root):
+            visits = store.visits[store.edge_child[edge]]
+            if visits > first:
+                first, second = visits, first
+            elif visits > second:
+                second = visits
+        rate = self.current_iteration / (now - self._search_start)
+        return first - second > rate * (self._deadline - now)
+    
+    def _run_iteration(self, root, board, root_depth):
+        """Run one select / expand / simulate / backpropagate cycle on the working board."""
+        clock = time.perf_counter
+        phase_seconds = self._phase_seconds
+        started = clock()
+        
+        # Selection phase: select a promising node
+        path = self._select(root, board, self._path)
+        selected = clock()
+        
+        # Expansion phase: expand the selected node
+        self._expand(path, board)
+        expanded = clock()
+        
+        # Simulation phase: simulate a random game from the leaf node
+        reward = self._simulate(path[-1], board)
+        simulated = clock()
+        
+        # Backpropagation phase: update statistics in the path
+        self._backpropagate(path, reward)
+        if self.rave_equivalence > 0:
+            self._backpropagate_amaf(path, board.played_moves(root_depth), reward)
         
-        return best_child.action if best_child else None
+        # Restore the working board to the root position
+        self._unwind(board, root_depth)
+        
+        phase_seconds[0] += selected - started
+        phase_seconds[1] += expanded - selected
+        phase_seconds[2] += simulated - expanded
+        phase_seconds[3] += clock() - simulated
+        self._record_depth(len(path) - 1)
+    
+    def _record_depth(self, depth):
+        """Add the depth of one descent to the search's depth statistics."""
+        self._depth_total += depth
+        if depth > self._max_depth:
+            self._max_depth = depth
     
-    def _select(self, node):
-        """Select a node to expand based on UCB values."""
-        if not node.children:  # Node needs expansion
-            return node
+    def _search_root_parallel(self, board, progress_callback=None):
+        """Run independent searches in the worker pool and merge them into one root."""
+        if self._root_parallel is None:
+            from parallel import RootParallelSearch
+            self._root_parallel = RootParallelSearch(self.workers)
+        
+        def on_worker_done(fraction):
+            self.current_iteration = int(fraction * self.difficulty)
+            if progress_callback:
+                progress_callback(self.get_progress())
+        
+        seeds = [self.rng.getrandbits(32) for _ in range(self.workers)]
+        self._start_budget()
+        merged = self._root_parallel.search(board, self._worker_options(), seeds, on_worker_done,
+                                            self.cancel_event)
+        self._deadline = None
+        self.current_iteration = sum(visits for visits, _ in merged.values())  # Summed over the workers
+        
+        # The workers search without the book, so its statistics are added once here
+        if self.book is not None:
+            valid_moves = board.get_valid_moves(self.ai_color)
+            for action, visits, reward in self.book.lookup(board, self.ai_color):
+                if action in valid_moves:
+                    totals = merged.setdefault(action, [0, 0.0])
+                    totals[0] += visits
+                    totals[1] += reward
+        
+        # Build a one-level tree holding the merged root statistics
+        self.reset_tree()
+        store = self.store
+        root = store.add_node(COLOR_INDEX[self.player_color])
+        squares = []
+        children = []
+        for action, (visits, reward) in merged.items():
+            child = store.add_node(COLOR_INDEX[self.ai_color], move_to_square(action), root)
+            store.visits[child] = visits
+            store.reward[child] = reward
+            store.visits[root] += visits
+            squares.append(move_to_square(action))
+            children.append(child)
+        store.set_children(root, squares, children)
+        return root
+    
+    def _worker_options(self):
+        """Keyword arguments for the single-process MCTSAI used inside worker processes."""
+        return {
+            'difficulty': self.difficulty,
+            'player_color': self.player_color,
+            'playouts_per_leaf': self.playouts_per_leaf,
+            'playout_policy': self.playout_policy,
+            'playout_cutoff': self.playout_cutoff,
+            'time_limit_ms': self.time_limit_ms,
+            'widening_coeff': self.widening_coeff,
+            'widening_exponent': self.widening_exponent,
+            'root_choice': self.root_choice,
+            'rave_equivalence': self.rave_equivalence,
+            'solver_empties': self.solver_empties,
+            'max_nodes': self.max_nodes,
+            'book_path': None,  # Book moves and root statistics are handled here, not in the workers
+        }
+    
+    def _search_tree_parallel(self, board, progress_callback=None):
+        """Grow one shared tree, evaluating batches of leaves in the worker pool."""
+        if self._playout_pool is None:
+            from parallel import PlayoutPool
+            self._playout_pool = PlayoutPool(self.workers)
+        
+        board = board.get_copy()
+        root_depth = len(board.history)
+        root = self._get_root(board)
+        self._seed_root(root, board)
+        self._start_budget()
+        
+        while not self._budget_exhausted(root):
+            batch_size = self.parallel_batch
+            if self.time_limit_ms is None:
+                batch_size = min(batch_size, self.difficulty - self.current_iteration)
             
-        if node.is_fully_expanded():
-            # Select child with highest UCB
-            best_child = None
-            best_ucb = float('-inf')
+            # Collect leaves; virtual loss steers later descents elsewhere
+            clock = time.perf_counter
+            phase_seconds = self._phase_seconds
+            paths = []
+            jobs = []
+            for _ in range(batch_size):
+                started = clock()
+                path = self._select(root, board)
+                selected = clock()
+                self._expand(path, board)
+                self._add_virtual_loss(path)
+                color = WHITE_TILE if self.store.color[path[-1]] == COLOR_INDEX[BLACK_TILE] else BLACK_TILE
+                jobs.append((board.get_copy(), color, self.rng.getrandbits(32)))
+                paths.append(path)
+                self._unwind(board, root_depth)
+                phase_seconds[0] += selected - started
+                phase_seconds[1] += clock() - selected
+                self._record_depth(len(path) - 1)
             
-            for child in node.children:
-                child_ucb = child.get_ucb()
-                if best_ucb < child_ucb:
-                    best_ucb = child_ucb
-                    best_child = child
-                    
-            return self._select(best_child)
-        else:
-            # Select first unvisited child
-            for child in node.children:
-                if child.visits == 0:
-                    return child
-    
-    def _expand(self, node):
-        """Expand the selected node by adding all possible child nodes."""
-        if node.visits == 0:  # Node hasn't been visited yet
-            return node
+            # Evaluate the whole batch in the workers, then back up the results
+            started = clock()
+            rewards = self._playout_pool.evaluate(jobs, self._worker_options())
+            simulated = clock()
+            for path, job, reward in zip(paths, jobs, rewards):
+                self._remove_virtual_loss(path)
+                self._backpropagate(path, reward)
+                if self.rave_equivalence > 0:
+                    self._backpropagate_amaf(path, job[0].played_moves(root_depth), reward)
+            phase_seconds[2] += simulated - started
+            phase_seconds[3] += clock() - simulated
             
-        # Get the next player's color
-        next_color = WHITE_TILE if node.color == BLACK_TILE else BLACK_TILE
+            self.current_iteration += batch_size
+            if self.max_nodes and len(self.store) >= self.max_nodes:
+                root = self._prune(root)  # No descents are in flight between batches
+            if progress_callback:
+                progress_callback(self.get_progress())
         
-        # Get all valid moves for the next player
-        for action in node.board.get_valid_moves(next_color):
-            new_board = node.board.get_copy()
-            new_board.make_move(next_color, action[0], action[1])
-            node.add_child(new_board, action=action, color=next_color)
+        self._deadline = None
+        return root
+    
+    def _root_score(self, node, root):
+        """Score a visited root child under the root choice rule; timed searches always use 'visits'."""
+        if self.root_choice == 'visits' or self.time_limit_ms is not None:
+            return self.store.visits[node]
+        if self.root_choice == 'mean':
+            return self.store.reward[node] / self.store.visits[node]
+        return self._ucb(node, root)
+    
+    def _ucb(self, node, parent):
+        """Calculate the UCB (Upper Confidence Bound) value of node as a child of parent."""
+        store = self.store
+        visits = store.visits[node] + store.virtual_loss[node]
+        if visits == 0:
+            return sys.maxsize  # Unvisited nodes have max UCB
         
-        if not node.children:
-            return node
-            
-        return node.children[0]  # Return first child for simulation
+        # UCB formula: Q(s,a) + c * sqrt(ln(N(s)) / N(s,a)), with in-flight
+        # descents counted as lost visits so parallel descents spread out
+        parent_visits = store.visits[parent] + store.virtual_loss[parent]
+        exploration = math.sqrt(2.0 * math.log(parent_visits) / float(visits))
+        exploitation = (store.reward[node] + store.virtual_reward[node]) / visits
+        return exploitation + exploration
     
-    def _simulate(self, node):
-        """Simulate a random game from the current position to determine reward."""
-        board = node.board.get_copy()
-        color = node.color
+    def _select(self, node, board, path=None):
+        """
+        Select a node to expand based on UCB values, playing its moves on board.
+        
+        Descends in a loop without allocating: each node's untried moves are
+        taken in order from its `tried` counter, and once they are used up the
+        parent's log term is computed once for the UCB scan of its children.
         
-        # Play random moves until game over
-        while not board.is_game_over():
-            # Get valid moves for current player
-            valid_moves = board.get_valid_moves(color)
+        Args:
+            node: The node to start from
+            board: The working board, at node's position
+            path: Optional list to reuse for the result
+        
+        Returns the path of node IDs from the root to the selected node.
+        """
+        store = self.store
+        visits = store.visits
+        reward = store.reward
+        virtual_loss = store.virtual_loss
+        virtual_reward = store.virtual_reward
+        edge_child = store.edge_child
+        edge_move = store.edge_move
+        amaf_visits = store.edge_amaf_visits
+        amaf_reward = store.edge_amaf_reward
+        rave_equivalence = self.rave_equivalence
+        tried = store.tried
+        black_index = COLOR_INDEX[BLACK_TILE]
+        log = math.log
+        sqrt = math.sqrt
+        if path is None:
+            path = [node]
+        else:
+            path.clear()
+            path.append(node)
+        
+        while store.child_count[node]:  # Stop at nodes that need expansion
+            first = store.first_child[node]
+            limit = self._widened_count(node)
+            unvisited = tried[node] < limit
             
-            if valid_moves:  # If player can move
-                # Select a random valid move
-                action = random.choice(valid_moves)
-                board.make_move(color, action[0], action[1])
+            if unvisited:
+                # Try the next widened move that has not been selected yet
+                chosen = first + tried[node]
+                tried[node] += 1
+            else:
+                # All widened moves tried: select child with highest UCB,
+                # Q(s,a) + c * sqrt(ln(N(s)) / N(s,a)), with in-flight
+                # descents counted as lost visits so parallel descents spread out.
+                # With RAVE, Q is blended with the move's AMAF value, trusting
+                # AMAF less as the node collects visits of its own
+                parent_visits = visits[node] + virtual_loss[node]
+                log_visits = 2.0 * log(parent_visits)
+                beta = sqrt(rave_equivalence / (3.0 * parent_visits + rave_equivalence))
+                best_ucb = float('-inf')
+                chosen = first
+                for edge in range(first, first + limit):
+                    child = edge_child[edge]
+                    n = visits[child] + virtual_loss[child]
+                    if n == 0:
+                        chosen = edge
+                        break
+                    value = (reward[child] + virtual_reward[child]) / n
+                    if beta and amaf_visits[edge]:
+                        value += beta * (amaf_reward[edge] / amaf_visits[edge] - value)
+                    child_ucb = value + sqrt(log_visits / n)
+                    if best_ucb < child_ucb:
+                        best_ucb = child_ucb
+                        chosen = edge
             
-            # Switch player
-            color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+            color = WHITE_TILE if store.color[node] == black_index else BLACK_TILE
+            x, y = divmod(edge_move[chosen], BOARD_SIZE)
+            board.make_move(color, x, y)
             
-            # If new player can't move, switch back
-            new_valid_moves = board.get_valid_moves(color)
-            if not new_valid_moves:
-                color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
-                # If original player also can't move, game is over
-                if not board.get_valid_moves(color):
-                    break
-        
-        # Determine winner
-        scores = board.get_score()
-        ai_score = scores[self.ai_color]
-        player_score = scores[self.player_color]
-        
-        # Return 1 if AI wins, 0 otherwise
-        return 1 if ai_score > player_score else 0
-    
-    def _backpropagate(self, node, reward):
-        """Update statistics in all nodes along the path to the root."""
-        while node:
-            node.visits += 1
+            child = edge_child[chosen]
+            if child == NO_NODE:
+                child = self._materialize(node, chosen, board, color)
+            node = child
+            path.append(node)
+            if unvisited and not store.child_count[node]:
+                break  # A transposed node may already be expanded; keep descending then
+        
+        return path
+    
+    def _widened_count(self, node):
+        """Number of the node's moves (best prior first) that selection may currently choose from."""
+        count = self.store.child_count[node]
+        if self.widening_coeff <= 0:
+            return count
+        visits = self.store.visits[node] + self.store.virtual_loss[node]
+        return min(count, int(self.widening_coeff * visits ** self.widening_exponent) + 1)
+    
+    def _visited_edges(self, node):
+        """Yield the node's edges whose child exists and has been visited."""
+        store = self.store
+        for edge in store.edges(node):
+            child = store.edge_child[edge]
+            if child != NO_NODE and store.visits[child] > 0:
+                yield edge
+    
+    def _materialize(self, parent, edge, board, color):
+        """
+        Create the child node behind an edge the first time it is selected.
+        
+        board must already show the child position, where color has just moved;
+        a transposed position reuses the node already in the table.
+        """
+        store = self.store
+        child = None
+        if self.transposition is not None:
+            key = self._position_key(board, color)
+            child = self.transposition.get(key)
+        if child is None:
+            child = store.add_node(COLOR_INDEX[color], store.edge_move[edge], parent)
+            if self.transposition is not None:
+                self.transposition.put(key, child)
+        store.edge_child[edge] = child
+        return child
+    
+    def _expand(self, path, board):
+        """Expand the last node of the path, appending the child chosen for simulation."""
+        store = self.store
+        node = path[-1]
+        if store.visits[node] + store.virtual_loss[node] == 0:  # Node hasn't been visited yet
+            return
+        if store.child_count[node]:  # Already expanded, e.g. reached through a transposition
+            return
+        
+        # Get the next player's color
+        next_color = WHITE_TILE if store.color[node] == COLOR_INDEX[BLACK_TILE] else BLACK_TILE
+        
+        # Get all valid moves for the next player
+        valid_moves = board.get_valid_moves(next_color)
+        if not valid_moves:
+            return
+        
+        # Only record the moves, most promising first; child nodes are
+        # created lazily when selection first reaches them
+        valid_moves = sorted(valid_moves, key=lambda action: -SQUARE_WEIGHTS[action[0]][action[1]])
+        store.set_children(node, [move_to_square(action) for action in valid_moves],
+                           [NO_NODE] * len(valid_moves))
+        
+        # Use first child for simulation
+        board.make_move(next_color, valid_moves[0][0], valid_moves[0][1])
+        path.append(self._materialize(node, store.first_child[node], board, next_color))
+        store.tried[node] = 1
+    
+    def _simulate(self, node, board):
+        """Simulate a random game on board from the node's position to determine reward."""
+        # The node's color has just moved, so its opponent is to play
+        color = WHITE_TILE if self.store.color[node] == COLOR_INDEX[BLACK_TILE] else BLACK_TILE
+        return self.playout(board, color)
+    
+    def playout(self, board, color):
+        """Play out the game on board with color to move and return the reward for the AI."""
+        if self.playouts_per_leaf >= BATCH_PLAYOUT_MIN:
+            return self._playout_batch(board, color)
+        
+        # Leave only the last game on the board, for the AMAF update
+        depth = len(board.history)
+        total = 0.0
+        for index in range(self.playouts_per_leaf):
+            if index:
+                self._unwind(board, depth)
+            total += run_playout(board, color, self.ai_color, self._policy, self.rng, self.playout_cutoff)
+        return total / self.playouts_per_leaf
+    
+    def _playout_batch(self, board, color):
+        """Play several random games from the position at once and return the mean reward."""
+        if self._batch_playout is None:
+            # NumPy is only needed when batched playouts are enabled
+            from batch_playout import BatchPlayout
+            self._batch_playout = BatchPlayout(seed=self.rng.getrandbits(64))
+        
+        rewards = self._batch_playout.evaluate(board, color, self.ai_color, self.playouts_per_leaf)
+        return float(rewards.mean())
+    
+    def _backpropagate(self, path, reward):
+        """Update statistics in all nodes along the path from the root."""
+        store = self.store
+        ai_index = COLOR_INDEX[self.ai_color]
+        for node in path:
+            store.visits[node] += 1
             
             # Update rewards based on player perspective
-            if node.color == self.ai_color:
-                node.reward += reward
+            if store.color[node] == ai_index:
+                store.reward[node] += reward
             else:
-                node.reward -= reward
-                
-            node = node.parent
\ No newline at end of file
+                store.reward[node] -= reward
+    
+    def _backpropagate_amaf(self, path, moves, reward):
+        """
+        Update the AMAF statistics of the moves along the path.
+        
+        moves lists (color, square) for every move played from the root on,
+        path[i] having been left by moves[i]. Each node on the path credits
+        the reward to all of its moves that the side to move there went on to
+        play later in the descent or the playout. Batched playouts are not
+        played on the board, so only the tree part of their games counts.
+        """
+        store = self.store
+        edge_move = store.edge_move
+        amaf_visits = store.edge_amaf_visits
+        amaf_reward = store.edge_amaf_reward
+        ai_index = COLOR_INDEX[self.ai_color]
+        
+        # Squares played by each color from the current depth on; each square
+        # is played at most once per game, so a bitmask per color suffices
+        played = [0, 0]
+        for color, square in moves[len(path) - 1:]:
+            played[COLOR_INDEX[color]] |= 1 << square
+        
+        for depth in range(len(path) - 2, -1, -1):
+            color, square = moves[depth]
+            played[COLOR_INDEX[color]] |= 1 << square
+            
+            node = path[depth]
+            mover = 1 - store.color[node]
+            mask = played[mover]
+            credit = reward if mover == ai_index else -reward
+            for edge in store.edges(node):
+                if mask >> edge_move[edge] & 1:
+                    amaf_visits[edge] += 1
+                    amaf_reward[edge] += credit
+    
+    def _add_virtual_loss(self, path):
+        """Count an in-flight descent as a loss for every node on its path."""
+        store = self.store
+        ai_index = COLOR_INDEX[self.ai_color]
+        for node in path:
+            store.virtual_loss[node] += 1
+            if store.color[node] != ai_index:
+                store.virtual_reward[node] -= 1
+    
+    def _remove_virtual_loss(self, path):
+        """Undo `_add_virtual_loss` once the descent's playout has finished."""
+        store = self.store
+        ai_index = COLOR_INDEX[self.ai_color]
+        for node in path:
+            store.virtual_loss[node] -= 1
+            if store.color[node] != ai_index:
+                store.virtual_reward[node] += 1
+    
+    def _unwind(self, board, depth):
+        """Undo moves on board until its undo stack is back to the given depth."""
+        while len(board.history) > depth:
+            board.unmake_move()
@@ -0,0 +1,120 @@
+import numpy as np
+
+from bitboard import DIRECTIONS, FULL_MASK, board_to_bits
+from config import BOARD_SIZE, BLACK_TILE
+
+_SQUARES = BOARD_SIZE * BOARD_SIZE
+_SQUARE_SHIFTS = np.arange(_SQUARES, dtype=np.uint64)
+_ONE = np.uint64(1)
+_ZERO = np.uint64(0)
+
+# Direction table as numpy scalars: (shift amount, shifts left?, mask)
+_NP_DIRECTIONS = tuple(
+    (np.uint64(abs(shift)), shift > 0, np.uint64(mask & FULL_MASK))
+    for shift, mask in DIRECTIONS
+)
+
+
+def _shift(bits, amount, left, mask):
+    """Shift every bitboard in the array one step in a direction."""
+    if left:
+        return (bits << amount) & mask
+    return (bits >> amount) & mask
+
+
+def _generate_moves(own, opp):
+    """Vectorized version of `bitboard.generate_moves`."""
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for amount, left, mask in _NP_DIRECTIONS:
+        run = _shift(own, amount, left, mask) & opp
+        for _ in range(BOARD_SIZE - 3):
+            run |= _shift(run, amount, left, mask) & opp
+        moves |= _shift(run, amount, left, mask) & empty
+    return moves
+
+
+def _compute_flips(own, opp, move_bits):
+    """Vectorized version of `bitboard.compute_flips` for one move per game."""
+    flips = np.zeros_like(own)
+    for amount, left, mask in _NP_DIRECTIONS:
+        run = _shift(move_bits, amount, left, mask) & opp
+        for _ in range(BOARD_SIZE - 3):
+            run |= _shift(run, amount, left, mask) & opp
+        bounded = (_shift(run, amount, left, mask) & own) != 0
+        flips |= np.where(bounded, run, _ZERO)
+    return flips
+
+
+def popcount(bits):
+    """Count the set bits of every bitboard in the array."""
+    as_bytes = np.ascontiguousarray(bits, dtype=np.uint64).view(np.uint8)
+    return np.unpackbits(as_bytes).reshape(len(bits), -1).sum(axis=1)
+
+
+def boards_to_array(boards):
+    """Pack a sequence of boards into a (K, 2) uint64 array of [black, white]."""
+    return np.array([board_to_bits(board) for board in boards], dtype=np.uint64).reshape(-1, 2)
+
+
+class BatchPlayout:
+    """Plays many random Reversi games to the end in lockstep using NumPy."""
+
+    def __init__(self, seed=None):
+        """Initialize the engine with its own random generator."""
+        self.rng = np.random.default_rng(seed)
+
+    def play(self, positions, black_to_move):
+        """
+        Play random games from every position until neither side can move.
+
+        Args:
+            positions: (K, 2) uint64 array of [black, white] bitboards
+            black_to_move: (K,) bool array, True where black is to move
+
+        Returns:
+            (black_counts, white_counts) arrays with the final disc counts
+        """
+        positions = np.asarray(positions, dtype=np.uint64).reshape(-1, 2)
+        black_to_move = np.broadcast_to(np.asarray(black_to_move, dtype=bool), len(positions))
+
+        # Work from the point of view of the side to move and swap every ply
+        own = np.where(black_to_move, positions[:, 0], positions[:, 1])
+        opp = np.where(black_to_move, positions[:, 1], positions[:, 0])
+        own_is_black = black_to_move.copy()
+        passes = np.zeros(len(positions), dtype=np.int8)
+
+        active = passes < 2
+        while active.any():
+            legal = _generate_moves(own, opp)
+            can_move = active & (legal != 0)
+
+            # Pick a uniformly random legal square per game
+            legal_squares = ((legal[:, None] >> _SQUARE_SHIFTS) & _ONE).astype(bool)
+            keys = np.where(legal_squares, self.rng.random(legal_squares.shape), -1.0)
+            move_bits = np.where(can_move, _ONE << keys.argmax(axis=1).astype(np.uint64), _ZERO)
+
+            flips = _compute_flips(own, opp, move_bits)
+            own = own | move_bits | flips
+            opp = opp & ~flips
+
+            passes = np.where(can_move, 0, passes + active)
+            active = passes < 2
+            own, opp = opp, own
+            own_is_black = ~own_is_black
+
+        black = np.where(own_is_black, own, opp)
+        white = np.where(own_is_black, opp, own)
+        return popcount(black), popcount(white)
+
+    def playout_rewards(self, positions, black_to_move, ai_color):
+        """Play random games and return 1.0 where `ai_color` wins, 0.0 otherwise."""
+        black_counts, white_counts = self.play(positions, black_to_move)
+        if ai_color == BLACK_TILE:
+            return (black_counts > white_counts).astype(float)
+        return (white_counts > black_counts).astype(float)
+
+    def evaluate(self, board, color_to_move, ai_color, count):
+        """Play `count` random games from one board and return the reward array."""
+        positions = np.repeat(boards_to_array([board]), count, axis=0)
+        return self.playout_rewards(positions, color_to_move == BLACK_TILE, ai_color)
@@ -0,0 +1,173 @@
+import argparse
+import json
+import random
+import sys
+import time
+
+from bitboard import BitBoard
+from board import Board
+from config import BLACK_TILE, WHITE_TILE
+from playout import POLICIES
+
+BACKENDS = {'board': Board, 'bitboard': BitBoard}
+
+# Leaf counts from the starting position, indexed by depth. A forced pass
+# counts as a ply and a finished game counts as a leaf.
+PERFT_COUNTS = (1, 4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288)
+
+
+def perft(board, color, depth, passed=False):
+    """Count the leaf nodes of the move tree to the given depth, using make / unmake."""
+    if depth == 0:
+        return 1
+    opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+    moves = board.get_valid_moves(color)
+    if not moves:
+        if passed:
+            return 1  # Game over
+        return perft(board, opponent, depth - 1, True)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for x, y in list(moves):
+        board.make_move(color, x, y)
+        nodes += perft(board, opponent, depth - 1)
+        board.unmake_move()
+    return nodes
+
+
+def random_positions(board_class, count, seed):
+    """Return (board, color to move) pairs reached by random play, with the side to move able to move."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = board_class()
+        color = BLACK_TILE
+        for _ in range(rng.randrange(60)):
+            moves = board.get_valid_moves(color)
+            if not moves:
+                color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+                moves = board.get_valid_moves(color)
+                if not moves:
+                    break
+            board.make_move(color, *rng.choice(moves))
+            color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+        if board.get_valid_moves(color):
+            positions.append((board, color))
+    return positions
+
+
+def bench_perft(board_class, depth):
+    """Run perft to every depth up to depth and check the counts."""
+    results = []
+    for current in range(1, depth + 1):
+        board = board_class()
+        start = time.perf_counter()
+        nodes = perft(board, BLACK_TILE, current)
+        seconds = time.perf_counter() - start
+        expected = PERFT_COUNTS[current] if current < len(PERFT_COUNTS) else None
+        results.append({
+            'depth': current,
+            'nodes': nodes,
+            'expected': expected,
+            'ok': expected is None or nodes == expected,
+            'seconds': seconds,
+            'nodes_per_sec': nodes / seconds if seconds else None,
+        })
+    return results
+
+
+def bench_movegen(board_class, positions, seed):
+    """Time make_move / get_valid_moves / is_game_over / unmake_move over every move of random positions."""
+    cases = random_positions(board_class, positions, seed)
+    operations = 0
+    start = time.perf_counter()
+    for board, color in cases:
+        opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+        for x, y in list(board.get_valid_moves(color)):
+            board.make_move(color, x, y)
+            board.get_valid_moves(opponent)
+            board.is_game_over()
+            board.unmake_move()
+            operations += 1
+    seconds = time.perf_counter() - start
+    return {'positions': positions, 'moves': operations, 'seconds': seconds,
+            'moves_per_sec': operations / seconds if seconds else None}
+
+
+def bench_playouts(board_class, playouts, seed, policy):
+    """Time playouts of one playout policy from the starting position."""
+    from ai import MCTSAI
+
+    ai = MCTSAI(0, WHITE_TILE, playout_policy=policy, reuse_tree=False, book_path=None, seed=seed)
+    board = board_class()
+    start = time.perf_counter()
+    wins = 0
+    for _ in range(playouts):
+        depth = len(board.history)
+        wins += ai.playout(board, BLACK_TILE)
+        while len(board.history) > depth:
+            board.unmake_move()
+    seconds = time.perf_counter() - start
+    return {'playouts': playouts, 'wins': wins, 'seconds': seconds,
+            'playouts_per_sec': playouts / seconds if seconds else None}
+
+
+def bench_search(board_class, iterations, seed):
+    """Time one fixed-seed MCTS search from the starting position."""
+    from ai import MCTSAI
+
+    ai = MCTSAI(iterations, WHITE_TILE, reuse_tree=False, book_path=None, solver_empties=0, seed=seed)
+    start = time.perf_counter()
+    stats = ai.get_root_stats(board_class())
+    seconds = time.perf_counter() - start
+    return {'iterations': iterations, 'root_visits': sum(visits for _, visits, _ in stats),
+            'tree_nodes': len(ai.store), 'seconds': seconds,
+            'iterations_per_sec': iterations / seconds if seconds else None}
+
+
+def run(backend, depth, positions, playouts, iterations, seed):
+    """Run the whole suite for one board backend and return the results as a dict."""
+    board_class = BACKENDS[backend]
+    return {
+        'backend': backend,
+        'seed': seed,
+        'python': sys.version.split()[0],
+        'perft': bench_perft(board_class, depth),
+        'movegen': bench_movegen(board_class, positions, seed),
+        'playouts': {policy: bench_playouts(board_class, playouts, seed, policy) for policy in sorted(POLICIES)},
+        'search': bench_search(board_class, iterations, seed),
+    }
+
+
+def main():
+    """Command line entry point of the benchmark suite."""
+    parser = argparse.ArgumentParser(description="Perft check and micro-benchmarks of the Reversi engine.")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), action='append',
+                        help="board implementation to test (repeatable, default all)")
+    parser.add_argument('--depth', type=int, default=7, help="maximum perft depth")
+    parser.add_argument('--positions', type=int, default=200, help="random positions for move generation")
+    parser.add_argument('--playouts', type=int, default=500, help="playouts to time per playout policy")
+    parser.add_argument('--iterations', type=int, default=500, help="MCTS iterations to time")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--output', help="write the JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = [run(backend, args.depth, args.positions, args.playouts, args.iterations, args.seed)
+               for backend in args.backend or sorted(BACKENDS)]
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+
+    failed = [(result['backend'], entry['depth']) for result in results
+              for entry in result['perft'] if not entry['ok']]
+    for backend, depth in failed:
+        print("perft mismatch: %s at depth %d" % (backend, depth), file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
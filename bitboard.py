@@ -0,0 +1,314 @@
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE, EMPTY_TILE
+from zobrist import ZOBRIST_SQUARE, ZOBRIST_FLIP, hash_bits
+
+# Square (x, y) is stored in bit x * BOARD_SIZE + y of a 64-bit integer
+FULL_MASK = (1 << (BOARD_SIZE * BOARD_SIZE)) - 1
+
+# Squares whose y coordinate is not 0 / not BOARD_SIZE-1, used to stop shifts
+# along y from wrapping into the neighbouring column
+_NOT_Y_FIRST = FULL_MASK
+_NOT_Y_LAST = FULL_MASK
+for _x in range(BOARD_SIZE):
+    _NOT_Y_FIRST &= ~(1 << (_x * BOARD_SIZE))
+    _NOT_Y_LAST &= ~(1 << (_x * BOARD_SIZE + BOARD_SIZE - 1))
+
+# (shift, mask) pairs for the 8 directions; a positive shift moves bits up
+# (towards larger x / y), a negative one moves them down
+DIRECTIONS = []
+for _dx, _dy in [(0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)]:
+    _mask = _NOT_Y_FIRST if _dy == 1 else _NOT_Y_LAST if _dy == -1 else FULL_MASK
+    DIRECTIONS.append((_dx * BOARD_SIZE + _dy, _mask))
+DIRECTIONS = tuple(DIRECTIONS)
+
+
+# Number of set bits of an int; int.bit_count only exists from Python 3.10 on
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:
+    def popcount(bits):
+        """Return the number of set bits of bits."""
+        return bin(bits).count('1')
+
+
+def square_bit(x, y):
+    """Return the bit representing square (x, y)."""
+    return 1 << (x * BOARD_SIZE + y)
+
+
+def iter_squares(bits):
+    """Yield the (x, y) coordinates of every set bit, lowest square first."""
+    while bits:
+        low = bits & -bits
+        square = low.bit_length() - 1
+        yield square // BOARD_SIZE, square % BOARD_SIZE
+        bits ^= low
+
+
+def generate_moves(own, opp):
+    """Return a bitmask of the empty squares where `own` can flip discs of `opp`."""
+    empty = ~(own | opp) & FULL_MASK
+    moves = 0
+    for shift, mask in DIRECTIONS:
+        if shift > 0:
+            run = (own << shift) & mask & opp
+            run |= (run << shift) & mask & opp
+            run |= (run << shift) & mask & opp
+            run |= (run << shift) & mask & opp
+            run |= (run << shift) & mask & opp
+            run |= (run << shift) & mask & opp
+            moves |= (run << shift) & mask & empty
+        else:
+            shift = -shift
+            run = (own >> shift) & mask & opp
+            run |= (run >> shift) & mask & opp
+            run |= (run >> shift) & mask & opp
+            run |= (run >> shift) & mask & opp
+            run |= (run >> shift) & mask & opp
+            run |= (run >> shift) & mask & opp
+            moves |= (run >> shift) & mask & empty
+    return moves
+
+
+def board_to_bits(board):
+    """Return (black, white) bitboards for a `BitBoard` or a grid-based `Board`."""
+    if hasattr(board, 'black'):
+        return board.black, board.white
+    black = white = 0
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            if board.grid[x][y] == BLACK_TILE:
+                black |= square_bit(x, y)
+            elif board.grid[x][y] == WHITE_TILE:
+                white |= square_bit(x, y)
+    return black, white
+
+
+def compute_flips(own, opp, move_bit):
+    """Return the bitmask of `opp` discs flipped when `own` plays on `move_bit`."""
+    flips = 0
+    for shift, mask in DIRECTIONS:
+        line = 0
+        if shift > 0:
+            cursor = (move_bit << shift) & mask
+            while cursor & opp:
+                line |= cursor
+                cursor = (cursor << shift) & mask
+        else:
+            cursor = (move_bit >> -shift) & mask
+            while cursor & opp:
+                line |= cursor
+                cursor = (cursor >> -shift) & mask
+        if cursor & own:
+            flips |= line
+    return flips
+
+
+class BitBoard:
+    """Reversi board stored as one 64-bit integer per color.
+
+    Drop-in replacement for `board.Board`: the public methods take and return
+    the same values, and `grid` is provided as a read-only view for the GUI.
+    """
+
+    def __init__(self):
+        """Initialize a new board."""
+        self.reset()
+
+    def reset(self):
+        """Reset the board to the starting position."""
+        center = BOARD_SIZE // 2
+        self.black = square_bit(center-1, center-1) | square_bit(center, center)
+        self.white = square_bit(center-1, center) | square_bit(center, center-1)
+        # Incrementally maintained disc counts and empty squares
+        self.counts = {BLACK_TILE: 2, WHITE_TILE: 2}
+        self.empty = FULL_MASK & ~(self.black | self.white)
+        # Valid-move masks / lists per color, cleared whenever the board changes
+        self._moves = {}
+        self._move_lists = {}
+        # Zobrist hash of the piece placement, updated incrementally
+        self.hash = hash_bits(self.black, self.white)
+        # Undo records (color, move bit, flipped bits, previous hash), most recent last
+        self.history = []
+        self._grid = None
+
+    @classmethod
+    def from_bits(cls, black, white):
+        """Create a board with the given black and white bitboards and no move history."""
+        board = cls.__new__(cls)
+        board.black = black & FULL_MASK
+        board.white = white & FULL_MASK & ~board.black
+        board.counts = {BLACK_TILE: popcount(board.black), WHITE_TILE: popcount(board.white)}
+        board.empty = FULL_MASK & ~(board.black | board.white)
+        board._moves = {}
+        board._move_lists = {}
+        board.hash = hash_bits(board.black, board.white)
+        board.history = []
+        board._grid = None
+        return board
+
+    @property
+    def grid(self):
+        """Read-only grid[x][y] view of the board using tile characters."""
+        if self._grid is None:
+            black, white = self.black, self.white
+            rows = []
+            for x in range(BOARD_SIZE):
+                row = []
+                for y in range(BOARD_SIZE):
+                    bit = 1 << (x * BOARD_SIZE + y)
+                    if black & bit:
+                        row.append(BLACK_TILE)
+                    elif white & bit:
+                        row.append(WHITE_TILE)
+                    else:
+                        row.append(EMPTY_TILE)
+                rows.append(tuple(row))
+            self._grid = tuple(rows)
+        return self._grid
+
+    def position_key(self):
+        """Return a hashable value identifying the placement of all pieces."""
+        return self.black, self.white
+
+    def get_copy(self):
+        """Return a copy of the current board."""
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.black = self.black
+        new_board.white = self.white
+        new_board.counts = dict(self.counts)
+        new_board.empty = self.empty
+        new_board._moves = dict(self._moves)
+        new_board._move_lists = dict(self._move_lists)
+        new_board.hash = self.hash
+        new_board.history = list(self.history)
+        new_board._grid = self._grid
+        return new_board
+
+    def _split(self, color):
+        """Return (own, opponent) bitboards for the given color."""
+        if color == BLACK_TILE:
+            return self.black, self.white
+        return self.white, self.black
+
+    def is_on_board(self, x, y):
+        """Check if the coordinates are within the board boundaries."""
+        return 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE
+
+    def is_corner(self, x, y):
+        """Check if the coordinates represent a corner position."""
+        return x in (0, BOARD_SIZE-1) and y in (0, BOARD_SIZE-1)
+
+    def get_valid_moves_mask(self, color):
+        """Get a bitmask of all valid moves for the given color."""
+        moves = self._moves.get(color)
+        if moves is None:
+            own, opp = self._split(color)
+            moves = self._moves[color] = generate_moves(own, opp)
+        return moves
+
+    def get_valid_moves(self, color):
+        """
+        Get all valid moves for the given color.
+
+        The list is cached until the board changes and must not be modified.
+        """
+        moves = self._move_lists.get(color)
+        if moves is None:
+            moves = self._move_lists[color] = list(iter_squares(self.get_valid_moves_mask(color)))
+        return moves
+
+    def is_valid_move(self, color, x, y):
+        """Check if placing a piece at (x, y) is a valid move for the given color."""
+        if not self.is_on_board(x, y):
+            return False
+        bit = square_bit(x, y)
+        if not self.empty & bit:
+            return False
+        own, opp = self._split(color)
+        flips = compute_flips(own, opp, bit)
+        return list(iter_squares(flips)) if flips else False
+
+    def make_move(self, color, x, y):
+        """
+        Make a move at the given position if valid.
+
+        Returns an undo record (color, move bit, flipped bits, previous hash)
+        that is also pushed onto the undo stack, or False if the move is not
+        valid.
+        """
+        if not self.is_on_board(x, y):
+            return False
+        bit = square_bit(x, y)
+        if not self.empty & bit:
+            return False
+        own, opp = self._split(color)
+        flips = compute_flips(own, opp, bit)
+        if not flips:
+            return False
+
+        own |= bit | flips
+        opp &= ~flips
+        if color == BLACK_TILE:
+            self.black, self.white = own, opp
+        else:
+            self.white, self.black = own, opp
+        flipped = popcount(flips)
+        counts = self.counts
+        counts[color] += flipped + 1
+        counts[WHITE_TILE if color == BLACK_TILE else BLACK_TILE] -= flipped
+        self.empty &= ~bit
+        self._moves.clear()
+        self._move_lists.clear()
+        self._grid = None
+
+        record = (color, bit, flips, self.hash)
+
+        new_hash = self.hash ^ ZOBRIST_SQUARE[color][bit.bit_length() - 1]
+        while flips:
+            low = flips & -flips
+            new_hash ^= ZOBRIST_FLIP[low.bit_length() - 1]
+            flips ^= low
+        self.hash = new_hash
+
+        self.history.append(record)
+        return record
+
+    def unmake_move(self):
+        """Undo the most recent move and return its undo record."""
+        record = self.history.pop()
+        color, bit, flips, self.hash = record
+        if color == BLACK_TILE:
+            self.black &= ~(bit | flips)
+            self.white |= flips
+        else:
+            self.white &= ~(bit | flips)
+            self.black |= flips
+        flipped = popcount(flips)
+        counts = self.counts
+        counts[color] -= flipped + 1
+        counts[WHITE_TILE if color == BLACK_TILE else BLACK_TILE] += flipped
+        self.empty |= bit
+        self._moves.clear()
+        self._move_lists.clear()
+        self._grid = None
+        return record
+
+    def played_moves(self, start=0):
+        """Return (color, square index) for each move on the undo stack from index start."""
+        return [(color, bit.bit_length() - 1) for color, bit, _, _ in self.history[start:]]
+
+    def get_score(self):
+        """Get the current score (count of pieces for each player)."""
+        return dict(self.counts)
+
+    def get_empty_count(self):
+        """Get the number of empty squares."""
+        return popcount(self.empty)
+
+    def is_game_over(self):
+        """Check if the game is over."""
+        if not self.empty:
+            return True
+        return not (self.get_valid_moves_mask(BLACK_TILE) or
+                    self.get_valid_moves_mask(WHITE_TILE))
+
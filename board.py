@@ -1,4 +1,5 @@
 from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE, EMPTY_TILE
+from zobrist import ZOBRIST_SQUARE, ZOBRIST_FLIP, hash_grid
 
 class Board:
     """Represents the Reversi game board and its logic."""
@@ -17,6 +18,24 @@ class Board:
         self.grid[center-1][center] = WHITE_TILE
         self.grid[center][center-1] = WHITE_TILE
         self.grid[center][center] = BLACK_TILE
+        
+        # Incrementally maintained disc counts and empty squares
+        self.counts = {BLACK_TILE: 2, WHITE_TILE: 2}
+        self.empties = {(x, y) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE)
+                        if self.grid[x][y] == EMPTY_TILE}
+        
+        # Valid-move lists per color, cleared whenever the board changes
+        self._moves = {}
+        
+        # Zobrist hash of the piece placement, updated incrementally
+        self.hash = hash_grid(self.grid)
+        
+        # Undo records of the moves made so far, most recent last
+        self.history = []
+    
+    def position_key(self):
+        """Return a hashable value identifying the placement of all pieces."""
+        return tuple(tuple(column) for column in self.grid)
     
     def get_copy(self):
         """Return a deep copy of the current board."""
@@ -24,6 +43,11 @@ class Board:
         for x in range(BOARD_SIZE):
             for y in range(BOARD_SIZE):
                 new_board.grid[x][y] = self.grid[x][y]
+        new_board.counts = dict(self.counts)
+        new_board.empties = set(self.empties)
+        new_board._moves = dict(self._moves)
+        new_board.hash = self.hash
+        new_board.history = list(self.history)
         return new_board
     
     def is_on_board(self, x, y):
@@ -36,12 +60,16 @@ class Board:
         return (x, y) in corners
     
     def get_valid_moves(self, color):
-        """Get all valid moves for the given color."""
-        valid_moves = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if self.is_valid_move(color, x, y):
-                    valid_moves.append((x, y))
+        """
+        Get all valid moves for the given color.
+        
+        The list is cached until the board changes and must not be modified.
+        """
+        valid_moves = self._moves.get(color)
+        if valid_moves is None:
+            valid_moves = sorted(move for move in self.empties
+                                 if self.is_valid_move(color, move[0], move[1]))
+            self._moves[color] = valid_moves
         return valid_moves
     
     def is_valid_move(self, color, x, y):
@@ -80,7 +108,12 @@ class Board:
         return flippable_pieces if flippable_pieces else False
     
     def make_move(self, color, x, y):
-        """Make a move at the given position if valid."""
+        """
+        Make a move at the given position if valid.
+        
+        Returns an undo record (color, x, y, flipped pieces, previous hash) that
+        is also pushed onto the undo stack, or False if the move is not valid.
+        """
         flippable_pieces = self.is_valid_move(color, x, y)
         
         if not flippable_pieces:
@@ -90,35 +123,58 @@ class Board:
         self.grid[x][y] = color
         for flip_x, flip_y in flippable_pieces:
             self.grid[flip_x][flip_y] = color
-            
-        return True
+        
+        opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+        self.counts[color] += len(flippable_pieces) + 1
+        self.counts[opponent] -= len(flippable_pieces)
+        self.empties.discard((x, y))
+        self._moves.clear()
+        
+        record = (color, x, y, flippable_pieces, self.hash)
+        
+        new_hash = self.hash ^ ZOBRIST_SQUARE[color][x * BOARD_SIZE + y]
+        for flip_x, flip_y in flippable_pieces:
+            new_hash ^= ZOBRIST_FLIP[flip_x * BOARD_SIZE + flip_y]
+        self.hash = new_hash
+        
+        self.history.append(record)
+        return record
+    
+    def unmake_move(self):
+        """Undo the most recent move and return its undo record."""
+        record = self.history.pop()
+        color, x, y, flipped_pieces, self.hash = record
+        opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+        
+        self.grid[x][y] = EMPTY_TILE
+        for flip_x, flip_y in flipped_pieces:
+            self.grid[flip_x][flip_y] = opponent
+        
+        self.counts[color] -= len(flipped_pieces) + 1
+        self.counts[opponent] += len(flipped_pieces)
+        self.empties.add((x, y))
+        self._moves.clear()
+        
+        return record
+    
+    def played_moves(self, start=0):
+        """Return (color, square index) for each move on the undo stack from index start."""
+        return [(color, x * BOARD_SIZE + y) for color, x, y, _, _ in self.history[start:]]
     
     def get_score(self):
         """Get the current score (count of pieces for each player)."""
-        black_count = 0
-        white_count = 0
-        
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if self.grid[x][y] == BLACK_TILE:
-                    black_count += 1
-                elif self.grid[x][y] == WHITE_TILE:
-                    white_count += 1
-                    
-        return {BLACK_TILE: black_count, WHITE_TILE: white_count}
+        return dict(self.counts)
+    
+    def get_empty_count(self):
+        """Get the number of empty squares."""
+        return len(self.empties)
     
     def is_game_over(self):
         """Check if the game is over."""
         # Game ends if board is full
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if self.grid[x][y] == EMPTY_TILE:
-                    # Still have empty cells, check if any player can move
-                    if (self.get_valid_moves(BLACK_TILE) or 
-                        self.get_valid_moves(WHITE_TILE)):
-                        return False
-                    else:
-                        return True  # No valid moves for either player
-        
-        # Board is full
-        return True
\ No newline at end of file
+        if not self.empties:
+            return True
+        
+        # Still have empty cells, check if any player can move
+        return not (self.get_valid_moves(BLACK_TILE) or
+                    self.get_valid_moves(WHITE_TILE))
\ No newline at end of file
@@ -0,0 +1,207 @@
+import argparse
+import mmap
+import os
+import struct
+
+from bitboard import BitBoard
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE, EMPTY_TILE, BOOK_PATH
+from zobrist import ZOBRIST_SQUARE, ZOBRIST_SIDE
+
+# File layout: a header followed by records sorted by key, one record per
+# (position, move). Moves are stored in the canonical orientation.
+MAGIC = b'RVBK'
+VERSION = 1
+HEADER = struct.Struct('<4sII')  # magic, version, record count
+RECORD = struct.Struct('<QIfBxxx')  # key, visits, reward, move square
+_KEY = struct.Struct('<Q')
+
+
+def _symmetries():
+    """Return the 8 square permutations of the board's symmetry group."""
+    last = BOARD_SIZE - 1
+    maps = [
+        lambda x, y: (x, y),
+        lambda x, y: (y, last - x),
+        lambda x, y: (last - x, last - y),
+        lambda x, y: (last - y, x),
+        lambda x, y: (last - x, y),
+        lambda x, y: (x, last - y),
+        lambda x, y: (y, x),
+        lambda x, y: (last - y, last - x),
+    ]
+    perms = []
+    for transform in maps:
+        perm = [0] * (BOARD_SIZE * BOARD_SIZE)
+        for x in range(BOARD_SIZE):
+            for y in range(BOARD_SIZE):
+                tx, ty = transform(x, y)
+                perm[x * BOARD_SIZE + y] = tx * BOARD_SIZE + ty
+        perms.append(tuple(perm))
+    return tuple(perms)
+
+
+SYMMETRIES = _symmetries()
+INVERSE_SYMMETRIES = tuple(
+    tuple(perm.index(square) for square in range(BOARD_SIZE * BOARD_SIZE)) for perm in SYMMETRIES
+)
+
+
+def canonical_key(board, color):
+    """
+    Hash the position with color to move, folding the 8 board symmetries.
+
+    Returns:
+        (key, index into SYMMETRIES of the transform that produced it)
+    """
+    grid = board.grid
+    discs = [(x * BOARD_SIZE + y, grid[x][y])
+             for x in range(BOARD_SIZE) for y in range(BOARD_SIZE) if grid[x][y] != EMPTY_TILE]
+    best = None
+    for index, perm in enumerate(SYMMETRIES):
+        key = ZOBRIST_SIDE[color]
+        for square, tile in discs:
+            key ^= ZOBRIST_SQUARE[tile][perm[square]]
+        if best is None or key < best[0]:
+            best = (key, index)
+    return best
+
+
+class OpeningBook:
+    """Read-only opening book memory-mapped from a file written by `write_book`."""
+
+    def __init__(self, path):
+        """Map the book file into memory."""
+        with open(path, 'rb') as book_file:
+            self._data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self._data.close()
+            raise ValueError("%s is not a version %d opening book" % (path, VERSION))
+
+    def _key_at(self, index):
+        """Return the key of the record at index."""
+        return _KEY.unpack_from(self._data, HEADER.size + index * RECORD.size)[0]
+
+    def lookup(self, board, color):
+        """
+        Look up the position with color to move.
+
+        Returns:
+            list of (action, visits, reward) in the board's own orientation,
+            empty if the position is not in the book
+        """
+        key, symmetry = canonical_key(board, color)
+        inverse = INVERSE_SYMMETRIES[symmetry]
+
+        # Binary search for the first record with this key
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        stats = []
+        for index in range(lo, self.count):
+            record_key, visits, reward, square = RECORD.unpack_from(
+                self._data, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            stats.append((divmod(inverse[square], BOARD_SIZE), visits, reward))
+        return stats
+
+    def close(self):
+        """Unmap the book file."""
+        self._data.close()
+
+    def __len__(self):
+        """Return the number of records."""
+        return self.count
+
+
+def write_book(path, entries):
+    """
+    Write a book file.
+
+    Args:
+        path: Output file
+        entries: dict mapping canonical keys to lists of
+            (canonical move square, visits, reward)
+    """
+    records = sorted(
+        (key, square, visits, reward)
+        for key, moves in entries.items() for square, visits, reward in moves
+    )
+    with open(path, 'wb') as book_file:
+        book_file.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for key, square, visits, reward in records:
+            book_file.write(RECORD.pack(key, visits, reward, square))
+
+
+def build_book(plies, iterations, width, seed=0, progress=None):
+    """
+    Build book entries by searching positions reached from the start.
+
+    Every position up to `plies` moves deep is searched with `iterations`
+    MCTS iterations, and the `width` most visited moves are followed to
+    the next ply. Positions equal up to symmetry are searched once.
+
+    Returns:
+        dict in the form taken by `write_book`
+    """
+    from ai import MCTSAI
+
+    entries = {}
+    frontier = [(BitBoard(), BLACK_TILE)]
+    for ply in range(plies):
+        next_frontier = []
+        for board, color in frontier:
+            opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+            if board.is_game_over():
+                continue
+            if not board.get_valid_moves(color):
+                next_frontier.append((board, opponent))
+                continue
+
+            key, symmetry = canonical_key(board, color)
+            if key in entries:
+                continue
+            perm = SYMMETRIES[symmetry]
+
+            ai = MCTSAI(iterations, opponent, reuse_tree=False, solver_empties=0,
+                        book_path=None, seed=seed + len(entries))
+            stats = sorted(ai.get_root_stats(board), key=lambda stat: -stat[1])
+            entries[key] = [(perm[x * BOARD_SIZE + y], visits, reward)
+                            for (x, y), visits, reward in stats]
+            if progress:
+                progress(ply, len(entries))
+
+            for (x, y), _, _ in stats[:width]:
+                child = board.get_copy()
+                child.make_move(color, x, y)
+                next_frontier.append((child, opponent))
+        frontier = next_frontier
+    return entries
+
+
+def main():
+    """Command line entry point of the book builder."""
+    parser = argparse.ArgumentParser(description="Build a Reversi opening book.")
+    parser.add_argument('--output', default=BOOK_PATH, help="book file to write")
+    parser.add_argument('--plies', type=int, default=6, help="depth of the book in moves")
+    parser.add_argument('--iterations', type=int, default=4000, help="MCTS iterations per position")
+    parser.add_argument('--width', type=int, default=2, help="moves followed from each position")
+    parser.add_argument('--seed', type=int, default=0, help="base random seed")
+    args = parser.parse_args()
+
+    def progress(ply, count):
+        print("ply %d: %d positions" % (ply, count))
+
+    entries = build_book(args.plies, args.iterations, args.width, args.seed, progress)
+    write_book(args.output, entries)
+    print("wrote %d positions to %s" % (len(entries), os.path.abspath(args.output)))
+
+
+if __name__ == '__main__':
+    main()
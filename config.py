@@ -6,6 +6,107 @@ BOARD_SIZE = 8
 # AI difficulty (number of MCTS iterations)
 DIFFICULTY = 500
 
+# Optional wall-clock budget per AI move in milliseconds; when set it is used
+# instead of DIFFICULTY (None = fixed iteration count). A timed search plays
+# its most visited move regardless of ROOT_CHOICE and stops before the deadline
+# once that move can no longer be overtaken
+TIME_LIMIT_MS = None
+
+# Iterations between checks whether a timed search can stop early
+EARLY_STOP_INTERVAL = 16
+
+# Playouts per MCTS leaf; from BATCH_PLAYOUT_MIN on they are played as one NumPy batch
+PLAYOUTS_PER_LEAF = 1
+
+# Below this many playouts per leaf the NumPy batch is slower than playing the
+# games one by one (measured crossover: about 24), so smaller counts are
+# played one by one
+BATCH_PLAYOUT_MIN = 32
+
+# Move choice in playouts: 'random' (uniform) or 'weighted' (by PLAYOUT_WEIGHTS)
+PLAYOUT_POLICY = 'random'
+
+# Relative playout probability of a move on each square class; X squares are
+# diagonal and C squares orthogonal neighbours of the corners
+PLAYOUT_WEIGHTS = {'corner': 16, 'edge': 4, 'inner': 3, 'c_square': 1, 'x_square': 1}
+
+# Stop playouts after this many plies and score the position with the static
+# SQUARE_WEIGHTS evaluation instead (0 = play to the end of the game); the
+# evaluation is mapped to a reward by 1 / (1 + exp(-score / PLAYOUT_EVAL_SCALE))
+PLAYOUT_CUTOFF = 0
+PLAYOUT_EVAL_SCALE = 40.0
+
+# Worker processes for parallel search (1 = single-process search)
+WORKERS = 1
+
+# Parallel search mode: 'root' (independent trees, merged at the root) or
+# 'tree' (one shared tree with virtual loss and batched leaf playouts)
+SEARCH_MODE = 'root'
+
+# Leaves evaluated per batch in 'tree' mode
+PARALLEL_BATCH = 16
+
+# Keep the search tree between moves instead of starting from scratch
+REUSE_TREE = True
+
+# Maximum positions in the MCTS transposition table (0 = plain tree search)
+TRANSPOSITION_SIZE = 200000
+
+# Node budget of the search tree (0 = unlimited). When it is reached the least
+# visited subtrees are pruned until the tree is down to PRUNE_FRACTION of it
+MAX_TREE_NODES = 500000
+PRUNE_FRACTION = 0.5
+
+# Progressive widening: a node with N visits may select among its first
+# int(WIDENING_COEFF * N ** WIDENING_EXPONENT) + 1 moves, ordered by
+# SQUARE_WEIGHTS (WIDENING_COEFF = 0 makes every move selectable at once)
+WIDENING_COEFF = 2.0
+WIDENING_EXPONENT = 0.5
+
+# How the AI picks its move once the search is done: 'ucb' (highest UCB
+# value), 'visits' (most visited) or 'mean' (highest mean reward); timed
+# searches (TIME_LIMIT_MS) always use 'visits'
+ROOT_CHOICE = 'ucb'
+
+# RAVE (all-moves-as-first): number of visits at which a node's own statistics
+# and its AMAF statistics weigh equally in selection (0 = RAVE off)
+RAVE_EQUIVALENCE = 0
+
+# Positions with at most this many empty squares are solved exactly by the
+# endgame solver instead of being searched with MCTS (0 = never)
+SOLVER_EMPTIES = 10
+
+# Maximum positions in the endgame solver's own transposition table
+SOLVER_TABLE_SIZE = 200000
+
+# Opening book built by book.py (searched without a book if the file is missing)
+BOOK_PATH = 'book.bin'
+
+# Book positions with at least this many visits are played without searching;
+# smaller entries only seed the statistics of the search root
+BOOK_MIN_VISITS = 2000
+
+# Print the statistics of every AI search to the console
+VERBOSE = False
+
+# File that the statistics of every AI search are appended to as JSON lines (None = off)
+STATS_PATH = None
+
+# Static square values (corners good, squares next to corners bad), indexed [x][y]
+SQUARE_WEIGHTS = [
+    [100, -20, 10,  5,  5, 10, -20, 100],
+    [-20, -50, -2, -2, -2, -2, -50, -20],
+    [ 10,  -2,  1,  1,  1,  1,  -2,  10],
+    [  5,  -2,  1,  0,  0,  1,  -2,   5],
+    [  5,  -2,  1,  0,  0,  1,  -2,   5],
+    [ 10,  -2,  1,  1,  1,  1,  -2,  10],
+    [-20, -50, -2, -2, -2, -2, -50, -20],
+    [100, -20, 10,  5,  5, 10, -20, 100],
+]
+
+# Keep searching in the background while the human player is thinking
+PONDER = True
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -0,0 +1,122 @@
+import atexit
+import multiprocessing
+import queue
+
+
+def _engine_main(options, requests, results, progress, cancel):
+    """Worker process: serve search / ponder requests with one MCTSAI until told to quit."""
+    from ai import MCTSAI
+
+    def on_progress(fraction):
+        progress.value = fraction
+
+    ai = MCTSAI(cancel_event=cancel, **options)
+    try:
+        while True:
+            request = requests.get()
+            kind = request[0]
+            if kind == 'search':
+                _, request_id, board = request
+                ai.stop_pondering()
+                progress.value = 0.0
+                move, stats = ai.search(board, on_progress)
+                progress.value = 1.0
+                results.put((request_id, move, stats.to_dict()))
+            elif kind == 'ponder':
+                ai.start_pondering(request[1])
+            elif kind == 'stop_ponder':
+                ai.stop_pondering()
+            elif kind == 'quit':
+                break
+    finally:
+        ai.close()
+
+
+class EngineProcess:
+    """Runs an MCTSAI in a dedicated process so searches never block the caller.
+
+    Requests and results travel over queues, search progress is a shared
+    double written by the engine, and a shared event cancels the running
+    search. Only one search is outstanding at a time; results of cancelled
+    searches are discarded.
+    """
+
+    def __init__(self, **options):
+        """Start the engine process; options are MCTSAI keyword arguments."""
+        self._requests = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._progress = multiprocessing.Value('d', 0.0, lock=False)
+        self._cancel = multiprocessing.Event()
+        self._request_id = 0
+        self._pending = None
+        self.last_stats = None  # SearchStats.to_dict() of the last finished search
+        self.process = multiprocessing.Process(
+            target=_engine_main,
+            args=(options, self._requests, self._results, self._progress, self._cancel),
+        )
+        # Not a daemon: daemonic processes may not start the worker pools
+        # used by searches with workers > 1, so `close` ends it explicitly
+        self.process.start()
+        atexit.register(self.close)  # A left-over engine would otherwise block interpreter exit
+
+    def request_move(self, board):
+        """Start searching the board for the AI's move; the result is collected with `poll`."""
+        self._cancel.clear()
+        self._request_id += 1
+        self._pending = self._request_id
+        self._progress.value = 0.0
+        self._requests.put(('search', self._request_id, board))
+
+    def poll(self):
+        """
+        Check for the result of the outstanding search without blocking.
+
+        Returns:
+            (True, move) once the move is ready (move is None if the AI must
+            pass), (False, None) while the search is still running
+
+        Raises:
+            RuntimeError: If the engine process died, so callers waiting for a
+                move do not wait forever
+        """
+        while True:
+            try:
+                request_id, move, stats = self._results.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError("engine process exited with code %s" % self.process.exitcode)
+                return False, None
+            if request_id == self._pending:
+                self._pending = None
+                self.last_stats = stats
+                return True, move
+
+    def is_searching(self):
+        """Check whether a search has been requested and not yet collected."""
+        return self._pending is not None
+
+    def get_progress(self):
+        """Return the progress of the running search, between 0 and 1."""
+        return self._progress.value
+
+    def cancel(self):
+        """Stop the running search early and forget its result."""
+        self._pending = None
+        self._cancel.set()
+
+    def start_pondering(self, board):
+        """Let the engine search in the background while the opponent is to move."""
+        self._requests.put(('ponder', board))
+
+    def stop_pondering(self):
+        """Stop background search."""
+        self._requests.put(('stop_ponder',))
+
+    def close(self, timeout=1.0):
+        """Cancel any search and stop the engine process."""
+        self.cancel()
+        self._requests.put(('quit',))
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
@@ -0,0 +1,341 @@
+import argparse
+import ast
+import json
+import multiprocessing
+import socketserver
+import sys
+import threading
+
+from bitboard import BitBoard
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE, DIFFICULTY
+
+COLUMNS = 'abcdefgh'[:BOARD_SIZE]
+
+
+def format_move(action):
+    """Return the protocol name of an (x, y) action, or 'pass' for None."""
+    if action is None:
+        return 'pass'
+    return '%s%d' % (COLUMNS[action[0]], action[1] + 1)
+
+
+def parse_move(text):
+    """Return the (x, y) action named by text, or None for 'pass'."""
+    if text == 'pass':
+        return None
+    if not text or text[0] not in COLUMNS or not text[1:].isdigit():
+        raise ValueError("bad square %r" % text)
+    x = COLUMNS.index(text[0])
+    y = int(text[1:]) - 1
+    if not 0 <= y < BOARD_SIZE:
+        raise ValueError("bad square %r" % text)
+    return x, y
+
+
+def parse_position(tokens):
+    """
+    Build a position from the arguments of a 'position' command.
+
+    Returns:
+        (BitBoard, color to move)
+    """
+    if not tokens:
+        raise ValueError("missing position")
+    if tokens[0] == 'startpos':
+        board = BitBoard()
+        color = BLACK_TILE
+        rest = tokens[1:]
+    else:
+        if len(tokens) < 2 or len(tokens[0]) != BOARD_SIZE * BOARD_SIZE or tokens[1] not in ('b', 'w'):
+            raise ValueError("position needs 64 squares and the side to move")
+        black = white = 0
+        for square, tile in enumerate(tokens[0]):
+            if tile == 'b':
+                black |= 1 << square
+            elif tile == 'w':
+                white |= 1 << square
+            elif tile != '-':
+                raise ValueError("bad square character %r" % tile)
+        board = BitBoard.from_bits(black, white)
+        color = BLACK_TILE if tokens[1] == 'b' else WHITE_TILE
+        rest = tokens[2:]
+
+    if rest:
+        if rest[0] != 'moves':
+            raise ValueError("expected 'moves', got %r" % rest[0])
+        for text in rest[1:]:
+            action = parse_move(text)
+            if action is None:
+                if board.get_valid_moves(color):
+                    raise ValueError("pass while moves are available")
+            elif not board.make_move(color, action[0], action[1]):
+                raise ValueError("illegal move %s" % text)
+            color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+    return board, color
+
+
+def analysis_lines(stats):
+    """Return the protocol lines reporting a finished search."""
+    lines = []
+    for action, visits, reward in sorted(stats.root_children, key=lambda child: -child[1]):
+        lines.append("info move %s visits %d winrate %.4f" % (
+            format_move(action), visits, reward / visits if visits else 0.0))
+    if stats.proven_score is not None:
+        lines.append("info solved score %d" % stats.proven_score)
+    lines.append("info source %s iterations %d seconds %.3f nodes %d pv %s" % (
+        stats.source, stats.iterations, stats.seconds, stats.tree_nodes,
+        ' '.join(format_move(action) for action in stats.principal_variation) or '-'))
+    lines.append("bestmove %s" % format_move(stats.move))
+    return lines
+
+
+def analysis_record(stats):
+    """Return the JSON-serializable result of a finished search."""
+    return {
+        'bestmove': format_move(stats.move),
+        'source': stats.source,
+        'proven_score': stats.proven_score,
+        'iterations': stats.iterations,
+        'seconds': stats.seconds,
+        'moves': [
+            {'move': format_move(action), 'visits': visits, 'winrate': reward / visits if visits else 0.0}
+            for action, visits, reward in sorted(stats.root_children, key=lambda child: -child[1])
+        ],
+        'pv': [format_move(action) for action in stats.principal_variation],
+    }
+
+
+class EngineSession:
+    """One conversation of the engine's line protocol.
+
+    Squares are written as a column letter and a row number, 'a1' being
+    (0, 0) and 'h8' being (7, 7), and 'pass' is a pass. Commands:
+
+        position startpos [moves <move> ...]
+        position <64 of b / w / - for squares x * 8 + y> <b|w> [moves <move> ...]
+        set <MCTSAI option> <value>
+        go [iterations <n>] [time <ms>]
+        stop
+        isready
+        quit
+
+    `go` searches in the background and answers with one
+    `info move <move> visits <n> winrate <w>` line per root move, a summary
+    `info` line and `bestmove <move>`; `stop` ends the search early.
+    """
+
+    def __init__(self, output):
+        """Create a session writing replies to the text stream output."""
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.options = {'difficulty': DIFFICULTY}
+        self.engines = {}  # MCTSAI per side to move, so each keeps its own tree
+        self.board = BitBoard()
+        self.color = BLACK_TILE
+        self.cancel = threading.Event()
+        self.search_thread = None
+
+    def send(self, line):
+        """Write one reply line."""
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def run(self, lines):
+        """Handle commands until 'quit' or the end of the input."""
+        for line in lines:
+            tokens = line.split()
+            if not tokens:
+                continue
+            try:
+                if not self.handle(tokens):
+                    break
+            except Exception as error:  # Report anything, the session must keep running
+                self.send("error %s" % error)
+        self.stop()
+        for engine in self.engines.values():
+            engine.close()
+
+    def handle(self, tokens):
+        """Execute one command; returns False on 'quit'."""
+        command, args = tokens[0], tokens[1:]
+        if command == 'quit':
+            return False
+        if command == 'isready':
+            self.stop_wait()
+            self.send("readyok")
+        elif command == 'position':
+            self.stop()
+            self.board, self.color = parse_position(args)
+        elif command == 'set':
+            if len(args) != 2:
+                raise ValueError("usage: set <option> <value>")
+            self.stop()
+            try:
+                value = ast.literal_eval(args[1])
+            except (ValueError, SyntaxError):
+                value = args[1]
+            options = dict(self.options, **{args[0]: value})
+            self._check_options(options)  # Raises, keeping the previous options
+            self.options = options
+            for engine in self.engines.values():
+                engine.close()
+            self.engines.clear()
+        elif command == 'go':
+            self.stop()
+            self.go(args)
+        elif command == 'stop':
+            self.stop()
+        else:
+            raise ValueError("unknown command %r" % command)
+        return True
+
+    def _check_options(self, options):
+        """Raise if options cannot build an MCTSAI, e.g. an unknown name or a bad value."""
+        from ai import MCTSAI
+
+        MCTSAI(**dict({'player_color': WHITE_TILE}, **options)).close()
+
+    def _engine(self, color):
+        """Return the MCTSAI searching for color, creating it on first use."""
+        from ai import MCTSAI
+
+        engine = self.engines.get(color)
+        if engine is None:
+            opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+            options = dict({'player_color': opponent, 'cancel_event': self.cancel}, **self.options)
+            engine = self.engines[color] = MCTSAI(**options)
+        return engine
+
+    def go(self, args):
+        """Start searching the current position in the background."""
+        engine = self._engine(self.color)
+        engine.difficulty = self.options['difficulty']
+        engine.time_limit_ms = self.options.get('time_limit_ms')
+        for name, value in zip(args[::2], args[1::2]):
+            if name == 'iterations':
+                engine.difficulty = int(value)
+            elif name == 'time':
+                engine.time_limit_ms = int(value)
+            else:
+                raise ValueError("unknown search limit %r" % name)
+
+        board = self.board.get_copy()
+        self.cancel.clear()
+
+        def search():
+            try:
+                move, stats = engine.search(board)
+            except Exception as error:
+                # Clients wait for bestmove, so still answer one
+                self.send("error %s" % error)
+                self.send("bestmove pass")
+                return
+            for line in analysis_lines(stats):
+                self.send(line)
+
+        self.search_thread = threading.Thread(target=search)
+        self.search_thread.daemon = True
+        self.search_thread.start()
+
+    def stop(self):
+        """End the running search early; its results are still reported."""
+        if self.search_thread is not None:
+            self.cancel.set()
+            self.stop_wait()
+
+    def stop_wait(self):
+        """Wait for the running search, if any, to finish."""
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    """Serves one protocol session per TCP connection."""
+
+    def handle(self):
+        """Run a session over the connection."""
+        output = _SocketWriter(self.wfile)
+        EngineSession(output).run(line.decode('utf-8') for line in self.rfile)
+
+
+class _SocketWriter:
+    """Text-stream adapter writing UTF-8 lines to a socket file."""
+
+    def __init__(self, wfile):
+        """Wrap the connection's binary write file."""
+        self.wfile = wfile
+
+    def write(self, text):
+        """Encode and write text."""
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self):
+        """Flush the connection."""
+        self.wfile.flush()
+
+
+_batch_engines = {}
+
+
+def _analyze(job):
+    """Batch worker: search one position line and return its JSON-serializable result."""
+    from ai import MCTSAI
+
+    index, line, options = job
+    try:
+        board, color = parse_position(line.split())
+    except ValueError as error:
+        return {'line': index, 'position': line, 'error': str(error)}
+
+    # One engine per side to move and process, reused across positions
+    engine = _batch_engines.get(color)
+    if engine is None:
+        opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+        engine = _batch_engines[color] = MCTSAI(
+            **dict({'player_color': opponent, 'reuse_tree': False}, **options))
+    move, stats = engine.search(board)
+    return dict({'line': index, 'position': line}, **analysis_record(stats))
+
+
+def run_batch(path, options, workers, output=sys.stdout):
+    """Analyze every position of the file, writing JSON lines in completion order."""
+    with open(path) as positions:
+        jobs = [(index, line.strip(), options)
+                for index, line in enumerate(positions, 1) if line.strip() and not line.startswith('#')]
+
+    if workers > 1:
+        with multiprocessing.Pool(processes=workers) as pool:
+            results = pool.imap_unordered(_analyze, jobs)
+            for result in results:
+                output.write(json.dumps(result) + '\n')
+                output.flush()
+    else:
+        for job in jobs:
+            output.write(json.dumps(_analyze(job)) + '\n')
+            output.flush()
+
+
+def main():
+    """Command line entry point of the engine server."""
+    parser = argparse.ArgumentParser(description="Headless Reversi engine.")
+    parser.add_argument('--port', type=int, help="serve the protocol on this localhost TCP port instead of stdin")
+    parser.add_argument('--batch', help="analyze the positions in this file and exit")
+    parser.add_argument('--iterations', type=int, default=DIFFICULTY, help="MCTS iterations per position")
+    parser.add_argument('--time', type=int, help="time limit per position in ms (replaces iterations)")
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help="batch worker processes")
+    args = parser.parse_args()
+
+    if args.batch:
+        options = {'difficulty': args.iterations, 'time_limit_ms': args.time}
+        run_batch(args.batch, options, args.workers)
+    elif args.port:
+        with socketserver.ThreadingTCPServer(('127.0.0.1', args.port), _SocketHandler) as server:
+            server.serve_forever()
+    else:
+        EngineSession(sys.stdout).run(sys.stdin)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,21 @@ class GameGUI:
         self.font = pygame.font.SysFont(None, 48)
         self.small_font = pygame.font.SysFont(None, 24)
         
+        # Pre-rendered static layer (background and player indicators) that
+        # changed regions are restored from before being drawn again
+        self.layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.layer.fill(GRAY)
+        self.layer.blit(self.background, (0, 0))
+        self._indicators = None
+        
+        # What is currently drawn in each cell, and screen areas to update
+        self._cells = {}
+        self._board_key = None
+        self._progress_drawn = None
+        self._game_over_drawn = None
+        self._dirty = [self.screen.get_rect()]
+        self.screen.blit(self.layer, (0, 0))
+        
         # Setup clock
         self.clock = pygame.time.Clock()
         
@@ -23,65 +38,82 @@ class GameGUI:
         self.ai_progress = 0.0
         self.ai_thinking = False
     
+    def _restore(self, rect):
+        """Copy an area of the static layer back onto the screen and mark it for update."""
+        self.screen.blit(self.layer, rect, rect)
+        self._dirty.append(rect)
+    
     def draw_board(self, board, player_tile, valid_moves=None):
-        """Draw the game board with pieces and valid moves."""
-        # Draw board background
-        self.screen.fill(GRAY)
-        self.screen.blit(self.background, (0, 0))
+        """Draw the pieces and valid move hints of the cells that changed since the last call."""
+        board_key = (board.hash, tuple(valid_moves or ()))
+        if board_key == self._board_key:
+            return
+        self._board_key = board_key
         
-        # Draw pieces
-        for x in range(len(board.grid)):
-            for y in range(len(board.grid[x])):
-                # Draw black pieces
-                if board.grid[x][y] == BLACK_TILE:
-                    pygame.draw.circle(
-                        self.screen, 
-                        BLACK, 
-                        [CELL_SIZE // 2 + CELL_SIZE * x, CELL_SIZE // 2 + CELL_SIZE * y], 
-                        PIECE_RADIUS, 
-                        PIECE_RADIUS
-                    )
-                # Draw white pieces
-                elif board.grid[x][y] == WHITE_TILE:
-                    pygame.draw.circle(
-                        self.screen, 
-                        WHITE, 
-                        [CELL_SIZE // 2 + CELL_SIZE * x, CELL_SIZE // 2 + CELL_SIZE * y], 
-                        PIECE_RADIUS, 
-                        PIECE_RADIUS
-                    )
-                # Draw valid move hints
-                elif valid_moves and (x, y) in valid_moves:
-                    pygame.draw.circle(
-                        self.screen, 
-                        GREEN, 
-                        [CELL_SIZE // 2 + CELL_SIZE * x, CELL_SIZE // 2 + CELL_SIZE * y], 
-                        HINT_RADIUS, 
-                        HINT_RADIUS
-                    )
+        hints = set(valid_moves or ())
+        grid = board.grid
+        for x in range(len(grid)):
+            for y in range(len(grid[x])):
+                # Pieces, valid move hints or nothing
+                if grid[x][y] == BLACK_TILE or grid[x][y] == WHITE_TILE:
+                    content = grid[x][y]
+                elif (x, y) in hints:
+                    content = 'hint'
+                else:
+                    content = None
+                if self._cells.get((x, y)) == content:
+                    continue
+                self._cells[(x, y)] = content
+                
+                self._restore(pygame.Rect(CELL_SIZE * x, CELL_SIZE * y, CELL_SIZE, CELL_SIZE))
+                center = [CELL_SIZE // 2 + CELL_SIZE * x, CELL_SIZE // 2 + CELL_SIZE * y]
+                if content == BLACK_TILE:
+                    pygame.draw.circle(self.screen, BLACK, center, PIECE_RADIUS, PIECE_RADIUS)
+                elif content == WHITE_TILE:
+                    pygame.draw.circle(self.screen, WHITE, center, PIECE_RADIUS, PIECE_RADIUS)
+                elif content == 'hint':
+                    pygame.draw.circle(self.screen, GREEN, center, HINT_RADIUS, HINT_RADIUS)
     
     def draw_player_indicators(self, player_tile, computer_tile):
-        """Draw indicators showing which color belongs to which player."""
+        """Draw indicators showing which color belongs to which player into the static layer."""
+        if self._indicators == (player_tile, computer_tile):
+            return
+        self._indicators = (player_tile, computer_tile)
+        
         # Draw player label
         player_text = self.font.render("you", True, YELLOW)
-        self.screen.blit(player_text, (870, 730))
+        self.layer.blit(player_text, (870, 730))
         
         # Draw AI label
         ai_text = self.font.render("AI", True, YELLOW)
-        self.screen.blit(ai_text, (880, 130))
+        self.layer.blit(ai_text, (880, 130))
         
         # Draw player color indicator
         player_color = BLACK if player_tile == BLACK_TILE else WHITE
-        pygame.draw.circle(self.screen, player_color, [900, 700], HINT_RADIUS, HINT_RADIUS)
+        pygame.draw.circle(self.layer, player_color, [900, 700], HINT_RADIUS, HINT_RADIUS)
         
         # Draw AI color indicator
         ai_color = BLACK if computer_tile == BLACK_TILE else WHITE
-        pygame.draw.circle(self.screen, ai_color, [900, 100], HINT_RADIUS, HINT_RADIUS)
-    
-    
+        pygame.draw.circle(self.layer, ai_color, [900, 100], HINT_RADIUS, HINT_RADIUS)
+        
+        # The layer changed under everything: repaint the whole screen
+        self._cells.clear()
+        self._board_key = None
+        self._progress_drawn = None
+        self._game_over_drawn = None
+        self._restore(self.screen.get_rect())
     
     def draw_progress_bar(self):
-        """Draw the AI thinking progress bar."""
+        """Draw the AI thinking progress bar if its state changed."""
+        fill_width = int(PROGRESS_BAR_WIDTH * self.ai_progress) if self.ai_thinking else 0
+        state = (self.ai_thinking, fill_width)
+        if state == self._progress_drawn:
+            return
+        self._progress_drawn = state
+        
+        # Area of the bar and its caption
+        self._restore(pygame.Rect(PROGRESS_BAR_X, PROGRESS_BAR_Y - 25,
+                                  PROGRESS_BAR_WIDTH, PROGRESS_BAR_HEIGHT + 25))
         if self.ai_thinking:
             # Draw progress bar background
             pygame.draw.rect(
@@ -92,7 +124,6 @@ class GameGUI:
             )
             
             # Draw progress bar fill
-            fill_width = int(PROGRESS_BAR_WIDTH * self.ai_progress)
             if fill_width > 0:
                 pygame.draw.rect(
                     self.screen, 
@@ -125,14 +156,20 @@ class GameGUI:
             result = "Lose"
             
         output_text = f"{result}. {player_score}:{computer_score}"
+        if output_text == self._game_over_drawn:
+            return
+        self._game_over_drawn = output_text
         text_surface = self.font.render(output_text, True, BLACK, YELLOW)
         text_rect = text_surface.get_rect()
         text_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
         self.screen.blit(text_surface, text_rect)
+        self._dirty.append(text_rect)
     
     def update_display(self):
-        """Update the display."""
-        pygame.display.update()
+        """Update the areas of the display that changed since the last frame."""
+        if self._dirty:
+            pygame.display.update(self._dirty)
+            self._dirty = []
         self.clock.tick(TICK_RATE)
     
     def get_clicked_cell(self):
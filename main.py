@@ -1,12 +1,11 @@
 import pygame
 import sys
 import random
-import threading
 from pygame.locals import *
 
-from config import BLACK_TILE, WHITE_TILE, DIFFICULTY
-from board import Board
-from ai import MCTSAI
+from config import BLACK_TILE, WHITE_TILE, DIFFICULTY, PONDER
+from bitboard import BitBoard
+from engine_process import EngineProcess
 from gui import GameGUI
 
 def who_goes_first():
@@ -18,15 +17,10 @@ def who_goes_first():
         print("Player goes first")
         return 0
 
-def ai_move_thread(ai, board, computer_tile, gui, result_queue):
-    """在单独的线程中运行AI思考过程"""
-    move = ai.get_best_move(board, lambda progress: gui.update_ai_progress(progress))
-    result_queue.append(move)
-
 def main():
     """Main game function."""
     # Initialize game components
-    board = Board()
+    board = BitBoard()
     gui = GameGUI()
     
     # Determine who goes first
@@ -40,25 +34,28 @@ def main():
         player_tile = WHITE_TILE
         computer_tile = BLACK_TILE
     
-    # Initialize AI
-    ai = MCTSAI(difficulty=DIFFICULTY, player_color=player_tile)
+    # Initialize AI in its own process so searching never stalls the window
+    ai = EngineProcess(difficulty=DIFFICULTY, player_color=player_tile)
+    if PONDER and turn == 0:
+        ai.start_pondering(board)
     
     # Game state variables
     game_over = False
     
-    # AI thinking thread variables
+    # AI thinking state
     ai_thinking = False
-    ai_move_result = []
-    ai_thread = None
+    
+    # Player move hints and the (position, turn) they were computed for
+    valid_moves = []
+    hints_key = None
     
     # Game loop
     while True:
         # Handle events
         for event in pygame.event.get():
             if event.type == QUIT:
-                if ai_thread and ai_thread.is_alive():
-                    # 等待AI线程完成，避免退出时的异常
-                    ai_thread.join(timeout=0.5)
+                # Cancels a running search and stops the engine process
+                ai.close()
                 gui.quit()
                 sys.exit()
                 
@@ -73,6 +70,9 @@ def main():
                 
                 # Make move if valid
                 if board.make_move(player_tile, col, row):
+                    # Stop background search; the AI continues from the matching subtree
+                    ai.stop_pondering()
+                    
                     # Check if AI can move next
                     if board.get_valid_moves(computer_tile):
                         turn = 1  # AI's turn
@@ -81,44 +81,45 @@ def main():
             
             # Debug key to force AI move
             if event.type == KEYUP and event.key == K_q:
+                ai.stop_pondering()
                 turn = 1
         
         # Handle AI move
         if not game_over and turn == 1:
             if not ai_thinking:
-                # Start AI thinking in a separate thread
+                # Send the position to the engine process
                 ai_thinking = True
                 gui.set_ai_thinking(True)
-                ai_move_result.clear()
-                ai_thread = threading.Thread(
-                    target=ai_move_thread,
-                    args=(ai, board, computer_tile, gui, ai_move_result)
-                )
-                ai_thread.daemon = True  # 设置为守护线程，这样当主程序退出时，线程也会退出
-                ai_thread.start()
+                ai.request_move(board)
             
-            elif ai_move_result:  # AI has finished thinking
-                move = ai_move_result[0]
-                ai_thinking = False
-                gui.set_ai_thinking(False)
-                
-                if move:
-                    x, y = move
-                    board.make_move(computer_tile, x, y)
+            else:
+                gui.update_ai_progress(ai.get_progress())
+                done, move = ai.poll()
                 
-                # Check if player can move next
-                if board.get_valid_moves(player_tile):
-                    turn = 0  # Player's turn
-                elif not board.get_valid_moves(computer_tile):
-                    game_over = True  # No moves available for either player
+                if done:  # AI has finished thinking
+                    ai_thinking = False
+                    gui.set_ai_thinking(False)
+                    
+                    if move:
+                        x, y = move
+                        board.make_move(computer_tile, x, y)
+                    
+                    # Check if player can move next
+                    if board.get_valid_moves(player_tile):
+                        turn = 0  # Player's turn
+                        if PONDER:
+                            ai.start_pondering(board)
+                    elif not board.get_valid_moves(computer_tile):
+                        game_over = True  # No moves available for either player
         
-        # Get current valid moves for the player
-        valid_moves = board.get_valid_moves(player_tile) if turn == 0 else []
+        # Recompute the player's move hints only when the position or turn changed
+        if (board.hash, turn) != hints_key:
+            hints_key = (board.hash, turn)
+            valid_moves = board.get_valid_moves(player_tile) if turn == 0 else []
         
-        # Draw game state
-        gui.draw_board(board, player_tile, valid_moves)
+        # Draw what changed since the last frame
         gui.draw_player_indicators(player_tile, computer_tile)
-        gui.draw_progress_bar()
+        gui.draw_board(board, player_tile, valid_moves)
         gui.draw_progress_bar()  # 绘制AI思考进度条
         
         # Handle game over state
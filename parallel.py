@@ -0,0 +1,111 @@
+import multiprocessing
+
+# How often a waiting search checks its cancel event
+CANCEL_POLL_SECONDS = 0.05
+
+
+def _root_search(args):
+    """Worker entry point: run one independent search and return its root statistics."""
+    from ai import MCTSAI
+
+    board, options, seed = args
+    ai = MCTSAI(workers=1, reuse_tree=False, seed=seed, **options)
+    return ai.get_root_stats(board)
+
+
+class RootParallelSearch:
+    """Runs independent MCTS searches from the same root in a pool of processes.
+
+    The pool is created once and kept alive between moves so that process
+    startup is not paid on every turn.
+    """
+
+    def __init__(self, workers):
+        """Start the worker processes."""
+        self.workers = workers
+        self.pool = multiprocessing.Pool(processes=workers)
+
+    def search(self, board, options, seeds, progress_callback=None, cancel_event=None):
+        """
+        Search the board once per seed and merge the root child statistics.
+
+        Args:
+            board: The position to search
+            options: MCTSAI keyword arguments for the per-worker searches
+            seeds: One random seed per independent search
+            progress_callback: Optional callback receiving the finished fraction
+            cancel_event: Optional Event; once set, the searches still running
+                are stopped and only the finished ones are merged
+
+        Returns:
+            dict mapping each root action to its summed [visits, reward]
+        """
+        jobs = [(board, options, seed) for seed in seeds]
+        merged = {}
+        results = self.pool.imap_unordered(_root_search, jobs)
+        for done in range(1, len(jobs) + 1):
+            # Wait in short slices so a cancel is noticed while workers are busy
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    # Restart the pool rather than let the abandoned searches
+                    # delay the next one
+                    self.close()
+                    self.pool = multiprocessing.Pool(processes=self.workers)
+                    return merged
+                try:
+                    stats = results.next(CANCEL_POLL_SECONDS)
+                    break
+                except multiprocessing.TimeoutError:
+                    pass
+            for action, visits, reward in stats:
+                totals = merged.setdefault(action, [0, 0.0])
+                totals[0] += visits
+                totals[1] += reward
+            if progress_callback:
+                progress_callback(done / len(jobs))
+        return merged
+
+    def close(self):
+        """Stop the worker processes."""
+        self.pool.terminate()
+        self.pool.join()
+
+
+def _leaf_playout(args):
+    """Worker entry point: play out one leaf position and return the AI's reward."""
+    from ai import MCTSAI
+
+    board, color, options, seed = args
+    ai = MCTSAI(workers=1, reuse_tree=False, seed=seed, **options)
+    return ai.playout(board, color)
+
+
+class PlayoutPool:
+    """Evaluates batches of leaf positions with random playouts in a pool of processes.
+
+    Used by tree-parallel search, where one shared tree is grown in the main
+    process and only the playouts are spread across cores.
+    """
+
+    def __init__(self, workers):
+        """Start the worker processes."""
+        self.workers = workers
+        self.pool = multiprocessing.Pool(processes=workers)
+
+    def evaluate(self, jobs, options):
+        """
+        Play out a batch of (board, color to move, seed) jobs.
+
+        `options` are the MCTSAI keyword arguments used for the playouts.
+
+        Returns:
+            list of rewards in the same order as the jobs
+        """
+        args = [(board, color, options, seed) for board, color, seed in jobs]
+        chunksize = max(1, len(args) // (self.workers * 2))
+        return self.pool.map(_leaf_playout, args, chunksize=chunksize)
+
+    def close(self):
+        """Stop the worker processes."""
+        self.pool.terminate()
+        self.pool.join()
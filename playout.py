@@ -0,0 +1,160 @@
+import math
+
+from bitboard import board_to_bits, popcount, square_bit
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE, SQUARE_WEIGHTS, PLAYOUT_WEIGHTS, PLAYOUT_EVAL_SCALE
+
+_LAST = BOARD_SIZE - 1
+
+
+def _square_class(x, y):
+    """Return the PLAYOUT_WEIGHTS class of square (x, y)."""
+    on_x_edge = x in (0, _LAST)
+    on_y_edge = y in (0, _LAST)
+    if on_x_edge and on_y_edge:
+        return 'corner'
+    near_x = x in (1, _LAST - 1)
+    near_y = y in (1, _LAST - 1)
+    if near_x and near_y:
+        return 'x_square'
+    if (on_x_edge and near_y) or (on_y_edge and near_x):
+        return 'c_square'
+    if on_x_edge or on_y_edge:
+        return 'edge'
+    return 'inner'
+
+
+def _masks(value_of):
+    """Group the squares by value_of(x, y) into {value: bitmask}."""
+    masks = {}
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            value = value_of(x, y)
+            masks[value] = masks.get(value, 0) | square_bit(x, y)
+    return masks
+
+
+# Bitmask of every square class, used by the weighted policy
+CLASS_MASKS = _masks(_square_class)
+
+# (weight, bitmask) for every distinct SQUARE_WEIGHTS value, used by the static evaluation
+WEIGHT_MASKS = tuple((weight, mask) for weight, mask in _masks(lambda x, y: SQUARE_WEIGHTS[x][y]).items()
+                     if weight)
+
+
+# Set bits of every byte value, lowest first, for picking the nth set bit of a bitmask
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def _nth_square(bits, n):
+    """Return the square of the nth (0-based, lowest first) set bit of bits, one table lookup per byte."""
+    shift = 0
+    while True:
+        byte_bits = _BYTE_BITS[bits >> shift & 0xFF]
+        if n < len(byte_bits):
+            return shift + byte_bits[n]
+        n -= len(byte_bits)
+        shift += 8
+
+
+def _moves_mask(board, color):
+    """Return the bitmask of color's valid moves on either board backend."""
+    if hasattr(board, 'get_valid_moves_mask'):
+        return board.get_valid_moves_mask(color)
+    mask = 0
+    for x, y in board.get_valid_moves(color):
+        mask |= square_bit(x, y)
+    return mask
+
+
+class RandomPolicy:
+    """Plays a uniformly random valid move."""
+
+    def choose(self, board, color, rng):
+        """Return the move to play, or None if color must pass."""
+        valid_moves = board.get_valid_moves(color)
+        return rng.choice(valid_moves) if valid_moves else None
+
+
+class WeightedPolicy:
+    """Plays valid moves with probability proportional to their square class weight.
+
+    The squares are split into a handful of classes (see PLAYOUT_WEIGHTS) with
+    one precomputed bitmask each. A move is drawn by picking a class in
+    proportion to weight * number of valid moves in it, then a uniform move
+    within the class located through a per-byte table, so the cost per move
+    is bounded by the number of classes and bytes, not the number of moves.
+    """
+
+    def __init__(self, weights=PLAYOUT_WEIGHTS):
+        """Build the (weight, class mask) table; classes with weight 0 are only played when nothing else is."""
+        self.classes = tuple((weights[name], mask) for name, mask in CLASS_MASKS.items())
+
+    def choose(self, board, color, rng):
+        """Return the move to play, or None if color must pass."""
+        moves = _moves_mask(board, color)
+        if not moves:
+            return None
+
+        buckets = []
+        total = 0
+        for weight, mask in self.classes:
+            bucket = moves & mask
+            if bucket and weight:
+                total += weight * popcount(bucket)
+                buckets.append((total, bucket))
+        if not buckets:
+            bucket = moves
+        else:
+            roll = rng.random() * total
+            for threshold, bucket in buckets:
+                if roll < threshold:
+                    break
+
+        square = _nth_square(bucket, rng.randrange(popcount(bucket)))
+        return square // BOARD_SIZE, square % BOARD_SIZE
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'weighted': WeightedPolicy,
+}
+
+
+def static_eval(board, color):
+    """Return the SQUARE_WEIGHTS positional score of the board from color's point of view."""
+    black, white = board_to_bits(board)
+    own, opp = (black, white) if color == BLACK_TILE else (white, black)
+    return sum(weight * (popcount(own & mask) - popcount(opp & mask)) for weight, mask in WEIGHT_MASKS)
+
+
+def run_playout(board, color, ai_color, policy, rng, cutoff=0):
+    """
+    Play a game on board with color to move and return the reward for ai_color.
+
+    The moves are made on board, so the caller can replay or undo them. A
+    finished game scores 1 for an AI win and 0 otherwise. With a cutoff, the
+    game stops after that many plies and the position is scored by
+    `static_eval`, squashed into (0, 1) with PLAYOUT_EVAL_SCALE.
+    """
+    opponent = {BLACK_TILE: WHITE_TILE, WHITE_TILE: BLACK_TILE}
+    choose = policy.choose
+    passes = 0
+    plies = 0
+
+    # Play moves until neither player can move
+    while passes < 2:
+        if cutoff and plies == cutoff:
+            score = static_eval(board, ai_color)
+            return 1.0 / (1.0 + math.exp(-score / PLAYOUT_EVAL_SCALE))
+
+        action = choose(board, color, rng)
+        if action is not None:
+            board.make_move(color, action[0], action[1])
+            passes = 0
+        else:
+            passes += 1
+        plies += 1
+        color = opponent[color]
+
+    scores = board.get_score()
+    return 1 if scores[ai_color] > scores[opponent[ai_color]] else 0
@@ -0,0 +1,271 @@
+import mmap
+import struct
+
+from bitboard import BitBoard
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE
+
+# Every file starts with a magic tag and a format version
+FILE_HEADER = struct.Struct('<4sI')
+POSITIONS_MAGIC = b'RVPS'
+GAMES_MAGIC = b'RVGM'
+VERSION = 1
+
+# Position: black bitboard, white bitboard, side to move (0 = black, 1 = white)
+POSITION = struct.Struct('<QQB')
+
+# Game: move count, final black minus white disc difference, MCTS iterations
+# per move of the black player (0 = time limit), total thinking seconds and
+# non-negative seed, followed by one byte per move
+GAME_HEADER = struct.Struct('<BbIfQ')
+PASS_SQUARE = 0xFF
+
+SIDES = (BLACK_TILE, WHITE_TILE)
+
+# Bytes read at a time by the streaming readers
+_CHUNK = 1 << 16
+
+
+def _side_index(color):
+    """Return the stored side-to-move byte of a color."""
+    return 0 if color == BLACK_TILE else 1
+
+
+def _open_checked(path, magic):
+    """Open a record file for reading and check its header."""
+    record_file = open(path, 'rb')
+    header = record_file.read(FILE_HEADER.size)
+    if len(header) != FILE_HEADER.size or FILE_HEADER.unpack(header) != (magic, VERSION):
+        record_file.close()
+        raise ValueError("%s is not a version %d %s file" % (path, VERSION, magic.decode()))
+    return record_file
+
+
+class _Writer:
+    """Buffered append-only writer shared by the position and game formats."""
+
+    magic = None
+
+    def __init__(self, path, append=False):
+        """Open path for writing; with append, new records go after the existing ones."""
+        self.file = open(path, 'ab' if append else 'wb')
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(self.magic, VERSION))
+
+    def close(self):
+        """Flush and close the file."""
+        self.file.close()
+
+    def __enter__(self):
+        """Use the object as a context manager that closes it."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close on leaving the with block."""
+        self.close()
+
+
+class PositionWriter(_Writer):
+    """Streams positions to a file, 17 bytes each."""
+
+    magic = POSITIONS_MAGIC
+
+    def write_bits(self, black, white, color):
+        """Append a position given as bitboards with color to move."""
+        self.file.write(POSITION.pack(black, white, _side_index(color)))
+
+    def write(self, board, color):
+        """Append a `BitBoard` position with color to move."""
+        self.write_bits(board.black, board.white, color)
+
+
+class PositionReader:
+    """Streams (black, white, color to move) tuples from a position file."""
+
+    def __init__(self, path):
+        """Open the file for sequential reading."""
+        self.file = _open_checked(path, POSITIONS_MAGIC)
+
+    def __iter__(self):
+        """Yield the positions in file order."""
+        size = POSITION.size
+        buffer = b''
+        while True:
+            chunk = self.file.read(_CHUNK * size)
+            if not chunk:
+                break
+            buffer += chunk
+            usable = len(buffer) - len(buffer) % size
+            for black, white, side in POSITION.iter_unpack(buffer[:usable]):
+                yield black, white, SIDES[side]
+            buffer = buffer[usable:]
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+    def __enter__(self):
+        """Use the object as a context manager that closes it."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close on leaving the with block."""
+        self.close()
+
+
+class MappedPositions:
+    """Random access to a position file through mmap."""
+
+    def __init__(self, path):
+        """Map the file into memory."""
+        with _open_checked(path, POSITIONS_MAGIC) as record_file:
+            self._data = mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = (len(self._data) - FILE_HEADER.size) // POSITION.size
+
+    def __len__(self):
+        """Return the number of positions."""
+        return self.count
+
+    def __getitem__(self, index):
+        """Return (black, white, color to move) of the position at index."""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        black, white, side = POSITION.unpack_from(self._data, FILE_HEADER.size + index * POSITION.size)
+        return black, white, SIDES[side]
+
+    def board(self, index):
+        """Return the position at index as (BitBoard, color to move)."""
+        black, white, color = self[index]
+        return BitBoard.from_bits(black, white), color
+
+    def close(self):
+        """Unmap the file."""
+        self._data.close()
+
+
+class GameRecord:
+    """One stored game: its moves, result and search metadata."""
+
+    def __init__(self, moves, result, iterations=0, seconds=0.0, seed=0):
+        """
+        Args:
+            moves: (x, y) actions in order, None for a pass
+            result: Final black minus white disc difference
+            iterations: MCTS iterations per move of the black player (0 when
+                it searched on a time limit)
+            seconds: Total thinking time of the game
+            seed: Non-negative seed the game was played with
+        """
+        self.moves = moves
+        self.result = result
+        self.iterations = iterations
+        self.seconds = seconds
+        self.seed = seed
+
+    def positions(self):
+        """Yield (board, color to move) before every move, replaying the game on one BitBoard."""
+        board = BitBoard()
+        color = BLACK_TILE
+        for action in self.moves:
+            yield board, color
+            if action is not None:
+                board.make_move(color, action[0], action[1])
+            color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+
+
+def _pack_game(game):
+    """Encode a GameRecord."""
+    squares = bytes(PASS_SQUARE if action is None else action[0] * BOARD_SIZE + action[1]
+                    for action in game.moves)
+    return GAME_HEADER.pack(len(squares), game.result, game.iterations, game.seconds, game.seed) + squares
+
+
+def _unpack_game(data, offset):
+    """Decode the game starting at offset; returns (GameRecord, offset after it)."""
+    count, result, iterations, seconds, seed = GAME_HEADER.unpack_from(data, offset)
+    start = offset + GAME_HEADER.size
+    moves = [None if square == PASS_SQUARE else divmod(square, BOARD_SIZE)
+             for square in data[start:start + count]]
+    return GameRecord(moves, result, iterations, seconds, seed), start + count
+
+
+class GameWriter(_Writer):
+    """Streams games to a file, 18 bytes plus one byte per move each."""
+
+    magic = GAMES_MAGIC
+
+    def write(self, game):
+        """Append a GameRecord."""
+        self.file.write(_pack_game(game))
+
+
+class GameReader:
+    """Streams GameRecords from a game file."""
+
+    def __init__(self, path):
+        """Open the file for sequential reading."""
+        self.file = _open_checked(path, GAMES_MAGIC)
+
+    def __iter__(self):
+        """Yield the games in file order."""
+        buffer = b''
+        offset = 0
+        while True:
+            # Decode every complete game in the buffer, then read more
+            while len(buffer) - offset >= GAME_HEADER.size:
+                end = offset + GAME_HEADER.size + buffer[offset]
+                if end > len(buffer):
+                    break
+                game, offset = _unpack_game(buffer, offset)
+                yield game
+            chunk = self.file.read(_CHUNK)
+            if not chunk:
+                break
+            buffer = buffer[offset:] + chunk
+            offset = 0
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+    def __enter__(self):
+        """Use the object as a context manager that closes it."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close on leaving the with block."""
+        self.close()
+
+
+class MappedGames:
+    """Random access to a game file through mmap.
+
+    Games have variable length, so opening the file scans the game headers
+    once to build an offset index.
+    """
+
+    def __init__(self, path):
+        """Map the file into memory and index its games."""
+        with _open_checked(path, GAMES_MAGIC) as record_file:
+            self._data = mmap.mmap(record_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = []
+        offset = FILE_HEADER.size
+        while offset + GAME_HEADER.size <= len(self._data):
+            end = offset + GAME_HEADER.size + self._data[offset]
+            if end > len(self._data):
+                break  # Game cut short by an interrupted writer
+            self.offsets.append(offset)
+            offset = end
+
+    def __len__(self):
+        """Return the number of games."""
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        """Return the GameRecord at index."""
+        return _unpack_game(self._data, self.offsets[index])[0]
+
+    def close(self):
+        """Unmap the file."""
+        self._data.close()
@@ -0,0 +1,84 @@
+import json
+
+# Phases of an MCTS iteration, in the order they run
+PHASES = ('select', 'expand', 'simulate', 'backpropagate')
+
+
+class SearchStats:
+    """Measurements of one move search, returned by `MCTSAI.search` with the move."""
+
+    def __init__(self):
+        """Create empty statistics."""
+        self.source = 'mcts'  # 'mcts', 'solver' or 'book'
+        self.move = None
+        self.seconds = 0.0
+        self.iterations = 0
+        self.playouts = 0
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.max_depth = 0
+        self.mean_depth = 0.0
+        self.tree_nodes = 0
+        self.tree_bytes = 0
+        self.prunes = 0  # Times the tree hit its node budget during the search
+        self.pruned_nodes = 0
+        self.principal_variation = []
+        self.root_children = []  # (action, visits, reward) per visited root move
+        self.proven_score = None  # Final disc difference when solved exactly
+        self.solver_nodes = 0
+
+    @property
+    def iterations_per_sec(self):
+        """Search iterations per second of wall-clock time."""
+        return self.iterations / self.seconds if self.seconds else 0.0
+
+    @property
+    def playouts_per_sec(self):
+        """Random playouts per second of wall-clock time."""
+        return self.playouts / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        """Return the statistics as a JSON-serializable dict."""
+        return {
+            'source': self.source,
+            'move': self.move,
+            'seconds': self.seconds,
+            'iterations': self.iterations,
+            'iterations_per_sec': self.iterations_per_sec,
+            'playouts': self.playouts,
+            'playouts_per_sec': self.playouts_per_sec,
+            'phase_seconds': dict(self.phase_seconds),
+            'max_depth': self.max_depth,
+            'mean_depth': self.mean_depth,
+            'tree_nodes': self.tree_nodes,
+            'tree_bytes': self.tree_bytes,
+            'prunes': self.prunes,
+            'pruned_nodes': self.pruned_nodes,
+            'principal_variation': self.principal_variation,
+            'root_children': [
+                {'move': action, 'visits': visits, 'reward': reward}
+                for action, visits, reward in self.root_children
+            ],
+            'proven_score': self.proven_score,
+            'solver_nodes': self.solver_nodes,
+        }
+
+    def to_json(self):
+        """Return the statistics as one line of JSON."""
+        return json.dumps(self.to_dict())
+
+    def format_table(self):
+        """Return the human-readable summary printed in verbose mode."""
+        lines = ["validmoves\trewards\tvisits"]
+        for action, visits, reward in self.root_children:
+            lines.append("%s \t : \t %s \t %s" % (action, reward, visits))
+        if self.proven_score is not None:
+            lines.append("solved\t %s \t : \t %s" % (self.move, self.proven_score))
+        phases = '  '.join("%s %.3fs" % (phase, self.phase_seconds[phase]) for phase in PHASES)
+        lines.append("%s %s in %.3fs, %d iterations (%.0f/s), %d nodes, depth %d / %.1f" % (
+            self.source, self.move, self.seconds, self.iterations, self.iterations_per_sec,
+            self.tree_nodes, self.max_depth, self.mean_depth))
+        lines.append(phases)
+        if self.prunes:
+            lines.append("pruned %d nodes in %d prunes" % (self.pruned_nodes, self.prunes))
+        lines.append("--------------------------")
+        return '\n'.join(lines)
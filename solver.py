@@ -0,0 +1,119 @@
+from config import BLACK_TILE, WHITE_TILE, SQUARE_WEIGHTS, SOLVER_TABLE_SIZE
+from transposition import TranspositionTable
+from zobrist import ZOBRIST_SIDE
+
+# Bound types of the values stored in the solver's table
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Below this many empty squares moves are ordered by square weight only;
+# above it the opponent's reply count is worth computing
+_MOBILITY_ORDERING_EMPTIES = 7
+
+
+class EndgameSolver:
+    """Exact negamax / alpha-beta solver for positions close to the end of the game.
+
+    Scores are final disc differences from the point of view of the side to
+    move. Moves are tried hash move first, then by fewest opponent replies
+    (or by SQUARE_WEIGHTS very close to the end). Positions are searched on
+    the board itself with make_move / unmake_move, and their bounds are kept
+    in a transposition table of their own.
+    """
+
+    def __init__(self, table_size=SOLVER_TABLE_SIZE):
+        """Create a solver whose table holds at most table_size positions."""
+        self.table = TranspositionTable(table_size)
+        self.nodes = 0
+
+    def solve(self, board, color):
+        """
+        Solve the position with color to move.
+
+        The board is restored before returning.
+
+        Returns:
+            (best move or None if color must pass, exact final disc difference for color)
+        """
+        self.nodes = 0
+        score = self._negamax(board, color, -64, 64, False)
+        entry = self.table.get(self._key(board, color))
+        move = entry[2] if entry is not None else None
+        return move, score
+
+    def _key(self, board, color):
+        """Table key of board with color to move."""
+        return board.hash ^ ZOBRIST_SIDE[color]
+
+    def _order_moves(self, board, color, moves, hash_move):
+        """Return the moves sorted best-first for the search."""
+        opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+        if board.get_empty_count() > _MOBILITY_ORDERING_EMPTIES:
+            def priority(action):
+                board.make_move(color, action[0], action[1])
+                replies = len(board.get_valid_moves(opponent))
+                board.unmake_move()
+                return replies * 1000 - SQUARE_WEIGHTS[action[0]][action[1]]
+        else:
+            def priority(action):
+                return -SQUARE_WEIGHTS[action[0]][action[1]]
+        ordered = sorted(moves, key=priority)
+        if hash_move in ordered:
+            ordered.remove(hash_move)
+            ordered.insert(0, hash_move)
+        return ordered
+
+    def _negamax(self, board, color, alpha, beta, passed):
+        """Return the final disc difference for color, exact when inside (alpha, beta)."""
+        self.nodes += 1
+        opponent = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+
+        moves = board.get_valid_moves(color)
+        if not moves:
+            if passed:  # Neither side can move: the game is over
+                counts = board.get_score()
+                return counts[color] - counts[opponent]
+            return -self._negamax(board, opponent, -beta, -alpha, True)
+
+        # Narrow the window with a stored bound
+        key = self._key(board, color)
+        entry = self.table.get(key)
+        hash_move = None
+        if entry is not None:
+            lower, upper, hash_move = entry
+            if lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            alpha = max(alpha, lower)
+            beta = min(beta, upper)
+
+        original_alpha = alpha
+        best_score = -65
+        best_move = None
+        for action in self._order_moves(board, color, moves, hash_move):
+            board.make_move(color, action[0], action[1])
+            score = -self._negamax(board, opponent, -beta, -alpha, False)
+            board.unmake_move()
+            if score > best_score:
+                best_score = score
+                best_move = action
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        # Fail-soft result: a lower bound on a cutoff, an upper bound if
+        # nothing beat the original alpha, exact otherwise
+        lower, upper = -64, 64
+        if entry is not None:
+            lower, upper = entry[0], entry[1]
+        if best_score >= beta:
+            lower = best_score
+        elif best_score <= original_alpha:
+            upper = best_score
+        else:
+            lower = upper = best_score
+        self.table.put(key, (lower, upper, best_move))
+        return best_score
@@ -0,0 +1,29 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai import MCTSAI
+from bitboard import BitBoard
+from config import BLACK_TILE
+
+
+def test_transposed_nodes_are_expanded_once():
+    """No search step may give a node that already has children a second child block."""
+    ai = MCTSAI(3000, BLACK_TILE, book_path=None, solver_empties=0, seed=1)
+    store = ai.store
+    set_children = store.set_children
+    replaced = []
+
+    def checked_set_children(node, moves, children):
+        if store.child_count[node]:
+            replaced.append(node)
+        set_children(node, moves, children)
+
+    store.set_children = checked_set_children
+    board = BitBoard()
+    board.make_move(BLACK_TILE, 2, 3)
+    ai.get_best_move(board)
+    ai.close()
+    assert ai.transposition is not None
+    assert replaced == []
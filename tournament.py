@@ -0,0 +1,261 @@
+import argparse
+import ast
+import json
+import math
+import multiprocessing
+import os
+import time
+
+from bitboard import BitBoard
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE, DIFFICULTY, TIME_LIMIT_MS
+from records import GameRecord, GameWriter, PASS_SQUARE
+
+# z value of a two-sided 95% confidence interval
+Z_95 = 1.959964
+
+
+def parse_player(spec):
+    """Parse 'key=value,key=value' MCTSAI options; values are Python literals or plain strings."""
+    options = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        key, _, value = item.partition('=')
+        try:
+            options[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            options[key.strip()] = value.strip()
+    return options
+
+
+def seed_arg(text):
+    """argparse type of --seed: a non-negative integer, as game files store seeds unsigned."""
+    seed = int(text)
+    if seed < 0:
+        raise argparse.ArgumentTypeError("seed must not be negative")
+    return seed
+
+
+def game_seed(base_seed, index):
+    """Deterministic seed of one game of the tournament."""
+    return base_seed * 1000003 + index
+
+
+def play_game(job):
+    """
+    Play one AI-vs-AI game and return its result record.
+
+    Player 'a' has black in even-numbered games and white in odd ones.
+    """
+    index, seed, options_a, options_b = job
+    a_color = BLACK_TILE if index % 2 == 0 else WHITE_TILE
+    b_color = WHITE_TILE if a_color == BLACK_TILE else BLACK_TILE
+
+    from ai import MCTSAI
+
+    # An MCTSAI plays the color opposite to its player_color
+    players = {
+        a_color: MCTSAI(**dict({'difficulty': DIFFICULTY, 'player_color': b_color, 'seed': seed}, **options_a)),
+        b_color: MCTSAI(**dict({'difficulty': DIFFICULTY, 'player_color': a_color, 'seed': seed + 1}, **options_b)),
+    }
+    think_time = {a_color: 0.0, b_color: 0.0}
+
+    board = BitBoard()
+    color = BLACK_TILE
+    squares = []  # Move squares in order, PASS_SQUARE for a pass
+    passes = 0
+    try:
+        while passes < 2:
+            if board.get_valid_moves(color):
+                start = time.perf_counter()
+                action = players[color].get_best_move(board)
+                think_time[color] += time.perf_counter() - start
+                board.make_move(color, action[0], action[1])
+                squares.append(action[0] * BOARD_SIZE + action[1])
+                passes = 0
+            else:
+                squares.append(PASS_SQUARE)
+                passes += 1
+            color = WHITE_TILE if color == BLACK_TILE else BLACK_TILE
+    finally:
+        for player in players.values():
+            player.close()
+
+    while squares and squares[-1] == PASS_SQUARE:
+        squares.pop()  # The passes that ended the game
+
+    scores = board.get_score()
+    if scores[a_color] > scores[b_color]:
+        winner = 'a'
+    elif scores[b_color] > scores[a_color]:
+        winner = 'b'
+    else:
+        winner = 'draw'
+    return {
+        'game': index,
+        'seed': seed,
+        'a': options_a,
+        'b': options_b,
+        'a_color': a_color,
+        'a_discs': scores[a_color],
+        'b_discs': scores[b_color],
+        'winner': winner,
+        'moves': sum(1 for square in squares if square != PASS_SQUARE),
+        'squares': squares,
+        'black_minus_white': scores[BLACK_TILE] - scores[WHITE_TILE],
+        'a_seconds': round(think_time[a_color], 3),
+        'b_seconds': round(think_time[b_color], 3),
+    }
+
+
+def load_results(path, options_a, options_b):
+    """Return the finished results for these players from a JSONL file, keyed by game index."""
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path) as results_file:
+        for line in results_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Line cut short by an interrupted run
+            if record.get('a') == options_a and record.get('b') == options_b:
+                results[record['game']] = record
+    return results
+
+
+def wilson_interval(score, games, z=Z_95):
+    """Return the Wilson score interval of a win rate of score points out of games."""
+    if games == 0:
+        return 0.0, 1.0
+    p = score / games
+    denominator = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def elo_difference(score_rate):
+    """Return the Elo difference implied by an expected score, infinite at 0 and 1."""
+    if score_rate <= 0.0:
+        return float('-inf')
+    if score_rate >= 1.0:
+        return float('inf')
+    return -400.0 * math.log10(1.0 / score_rate - 1.0)
+
+
+def summarize(results):
+    """Return win counts, score rate, its confidence interval and Elo estimates for player 'a'."""
+    games = len(results)
+    wins = sum(1 for record in results if record['winner'] == 'a')
+    losses = sum(1 for record in results if record['winner'] == 'b')
+    draws = games - wins - losses
+    score = wins + 0.5 * draws
+    rate = score / games if games else 0.5
+    low, high = wilson_interval(score, games)
+    return {
+        'games': games,
+        'wins': wins,
+        'losses': losses,
+        'draws': draws,
+        'score': rate,
+        'score_low': low,
+        'score_high': high,
+        'elo': elo_difference(rate),
+        'elo_low': elo_difference(low),
+        'elo_high': elo_difference(high),
+        'a_seconds': sum(record['a_seconds'] for record in results),
+        'b_seconds': sum(record['b_seconds'] for record in results),
+    }
+
+
+def game_record(result):
+    """
+    Convert a game result into a `records.GameRecord`.
+
+    The record has room for one iteration count, so it stores black's;
+    0 means black searched on a time limit instead.
+    """
+    moves = [None if square == PASS_SQUARE else divmod(square, BOARD_SIZE) for square in result['squares']]
+    black = result['a'] if result['a_color'] == BLACK_TILE else result['b']
+    iterations = 0 if black.get('time_limit_ms', TIME_LIMIT_MS) else black.get('difficulty', DIFFICULTY)
+    return GameRecord(moves, result['black_minus_white'], iterations,
+                      result['a_seconds'] + result['b_seconds'], result['seed'])
+
+
+def run_tournament(options_a, options_b, games, workers, base_seed, output, progress=None, games_path=None):
+    """
+    Play the games not yet in the output file and return the summary of all of them.
+
+    Each finished game is appended to output as one JSON line as soon as it
+    completes, so an interrupted run resumes where it stopped. With
+    games_path, newly played games are also appended to that binary game
+    file (see records.py).
+    """
+    if base_seed < 0:
+        raise ValueError("base seed must not be negative")
+    results = load_results(output, options_a, options_b)
+    jobs = [(index, game_seed(base_seed, index), options_a, options_b)
+            for index in range(games) if index not in results]
+
+    games_file = GameWriter(games_path, append=True) if games_path else None
+    with open(output, 'a') as results_file:
+        def record(result):
+            results[result['game']] = result
+            results_file.write(json.dumps(result) + '\n')
+            results_file.flush()
+            if games_file:
+                games_file.write(game_record(result))
+            if progress:
+                progress(result, summarize(list(results.values())))
+
+        if workers > 1:
+            with multiprocessing.Pool(processes=workers) as pool:
+                for result in pool.imap_unordered(play_game, jobs):
+                    record(result)
+        else:
+            for job in jobs:
+                record(play_game(job))
+    if games_file:
+        games_file.close()
+
+    return summarize([results[index] for index in range(games) if index in results])
+
+
+def main():
+    """Command line entry point of the tournament runner."""
+    parser = argparse.ArgumentParser(description="Play AI-vs-AI Reversi games between two MCTSAI settings.")
+    parser.add_argument('--a', default='', help="options of player a, e.g. 'difficulty=1000,rave_equivalence=300'")
+    parser.add_argument('--b', default='', help="options of player b, e.g. 'time_limit_ms=500'")
+    parser.add_argument('--games', type=int, default=100, help="number of games")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="games played in parallel")
+    parser.add_argument('--seed', type=seed_arg, default=0, help="base random seed (non-negative)")
+    parser.add_argument('--output', default='tournament.jsonl', help="JSONL results file, appended to and resumed from")
+    parser.add_argument('--games-file', help="also append the played games to this binary game file")
+    args = parser.parse_args()
+
+    options_a = parse_player(args.a)
+    options_b = parse_player(args.b)
+    if args.workers > 1 and max(options_a.get('workers', 1), options_b.get('workers', 1)) > 1:
+        parser.error("players with their own worker processes need --workers 1")
+
+    def progress(result, summary):
+        print("game %d: %s (%d-%d)  a scores %.3f [%.3f, %.3f] over %d games" % (
+            result['game'], result['winner'], result['a_discs'], result['b_discs'],
+            summary['score'], summary['score_low'], summary['score_high'], summary['games']))
+
+    summary = run_tournament(options_a, options_b, args.games, args.workers, args.seed, args.output, progress,
+                             args.games_file)
+    print("--------------------------")
+    print("a: %r" % options_a)
+    print("b: %r" % options_b)
+    print("games %d  wins %d  losses %d  draws %d" % (
+        summary['games'], summary['wins'], summary['losses'], summary['draws']))
+    print("score %.3f  95%% CI [%.3f, %.3f]" % (summary['score'], summary['score_low'], summary['score_high']))
+    print("Elo %+.0f  95%% CI [%+.0f, %+.0f]" % (summary['elo'], summary['elo_low'], summary['elo_high']))
+    print("thinking time  a %.1fs  b %.1fs" % (summary['a_seconds'], summary['b_seconds']))
+
+
+if __name__ == '__main__':
+    main()
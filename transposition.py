@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """Bounded map from position keys to search node IDs.
+
+    When the table is full the least recently used entry is evicted. An
+    evicted node stays in the tree; it just stops being shared with newly
+    reached transpositions.
+    """
+
+    def __init__(self, capacity):
+        """Create an empty table holding at most `capacity` entries."""
+        self.capacity = capacity
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        """Return the node ID stored for key, or None, marking it as recently used."""
+        node = self.entries.get(key)
+        if node is not None:
+            self.entries.move_to_end(key)
+        return node
+
+    def put(self, key, node):
+        """Store node under key, evicting the oldest entry if the table is full."""
+        self.entries[key] = node
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def remap(self, mapping):
+        """Renumber stored node IDs after compaction, dropping nodes missing from mapping."""
+        self.entries = OrderedDict(
+            (key, mapping[node]) for key, node in self.entries.items() if node in mapping
+        )
+
+    def clear(self):
+        """Remove all entries."""
+        self.entries.clear()
+
+    def __len__(self):
+        """Return the number of stored entries."""
+        return len(self.entries)
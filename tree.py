@@ -0,0 +1,195 @@
+import heapq
+from array import array
+
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE
+
+# Colors are stored as small integers in the node arrays
+COLOR_INDEX = {BLACK_TILE: 0, WHITE_TILE: 1}
+COLORS = (BLACK_TILE, WHITE_TILE)
+
+NO_NODE = -1
+NO_MOVE = -1
+
+
+def move_to_square(action):
+    """Convert an (x, y) action to its square index."""
+    return action[0] * BOARD_SIZE + action[1]
+
+
+def square_to_move(square):
+    """Convert a square index back to an (x, y) action."""
+    return divmod(square, BOARD_SIZE)
+
+
+class NodeStore:
+    """Struct-of-arrays storage for the MCTS tree.
+
+    Node IDs are integer indices into parallel typed arrays. The children of
+    a node are a contiguous block of edges starting at `first_child`, and
+    each edge records the child's node ID and the move leading to it, so a
+    node shared through the transposition table can be reached by different
+    moves from different parents. An edge whose child has not been created
+    yet holds NO_NODE.
+    """
+
+    def __init__(self):
+        """Create an empty store."""
+        self.clear()
+
+    def clear(self):
+        """Remove all nodes and edges."""
+        # Per-node statistics
+        self.visits = array('q')
+        self.reward = array('d')
+        self.virtual_loss = array('q')  # Descents in flight (tree-parallel search)
+        self.virtual_reward = array('d')  # Reward those descents are assumed to lose
+
+        # Per-node structure
+        self.parent = array('q')  # Parent the node was first created from
+        self.first_child = array('q')  # Index of the first edge of the child block
+        self.child_count = array('q')
+        self.tried = array('q')  # Leading edges already selected at least once
+        self.move = array('b')  # Square of the move that created the node
+        self.color = array('b')  # Color index of the player who just moved
+
+        # Per-edge arrays
+        self.edge_child = array('q')
+        self.edge_move = array('b')
+        self.edge_amaf_visits = array('q')  # All-moves-as-first statistics (RAVE)
+        self.edge_amaf_reward = array('d')
+
+    def __len__(self):
+        """Return the number of nodes."""
+        return len(self.visits)
+
+    def nbytes(self):
+        """Return the memory used by the node and edge arrays, in bytes."""
+        return sum(values.itemsize * len(values) for values in (
+            self.visits, self.reward, self.virtual_loss, self.virtual_reward, self.parent,
+            self.first_child, self.child_count, self.tried, self.move, self.color,
+            self.edge_child, self.edge_move, self.edge_amaf_visits, self.edge_amaf_reward))
+
+    def add_node(self, color, move=NO_MOVE, parent=NO_NODE):
+        """Append a new unvisited node and return its ID."""
+        self.visits.append(0)
+        self.reward.append(0.0)
+        self.virtual_loss.append(0)
+        self.virtual_reward.append(0.0)
+        self.parent.append(parent)
+        self.first_child.append(0)
+        self.child_count.append(0)
+        self.tried.append(0)
+        self.move.append(move)
+        self.color.append(color)
+        return len(self.visits) - 1
+
+    def set_children(self, node, moves, children):
+        """Attach a block of edges (move squares and child IDs or NO_NODE) to an unexpanded node."""
+        self.first_child[node] = len(self.edge_child)
+        self.child_count[node] = len(children)
+        self.edge_child.extend(children)
+        self.edge_move.extend(moves)
+        self.edge_amaf_visits.extend([0] * len(children))
+        self.edge_amaf_reward.extend([0.0] * len(children))
+
+    def edges(self, node):
+        """Return the range of edge indices holding the node's children."""
+        first = self.first_child[node]
+        return range(first, first + self.child_count[node])
+
+    def compact(self, root, transposition=None):
+        """
+        Keep only the nodes reachable from root and renumber them.
+
+        The root becomes node 0. Transposition table entries are remapped to
+        the new IDs, and entries for dropped nodes are removed.
+
+        Returns:
+            the new ID of the root (always 0)
+        """
+        # Number reachable nodes in breadth-first order
+        mapping = {root: 0}
+        order = [root]
+        edge_child = self.edge_child
+        for node in order:
+            first = self.first_child[node]
+            for edge in range(first, first + self.child_count[node]):
+                child = edge_child[edge]
+                if child != NO_NODE and child not in mapping:
+                    mapping[child] = len(order)
+                    order.append(child)
+
+        old = (self.visits, self.reward, self.virtual_loss, self.virtual_reward,
+               self.parent, self.first_child, self.child_count, self.tried, self.move,
+               self.color, self.edge_child, self.edge_move, self.edge_amaf_visits,
+               self.edge_amaf_reward)
+        (visits, reward, virtual_loss, virtual_reward, parent, first_child,
+         child_count, tried, move, color, edge_child, edge_move, edge_amaf_visits,
+         edge_amaf_reward) = old
+        self.clear()
+
+        for node in order:
+            new_id = self.add_node(color[node], move[node], mapping.get(parent[node], NO_NODE))
+            self.visits[new_id] = visits[node]
+            self.reward[new_id] = reward[node]
+            self.virtual_loss[new_id] = virtual_loss[node]
+            self.virtual_reward[new_id] = virtual_reward[node]
+            self.tried[new_id] = tried[node]
+        self.parent[0] = NO_NODE
+
+        for node in order:
+            count = child_count[node]
+            if count:
+                first = first_child[node]
+                self.set_children(
+                    mapping[node],
+                    edge_move[first:first + count],
+                    [mapping.get(child, NO_NODE) for child in edge_child[first:first + count]],
+                )
+                new_first = self.first_child[mapping[node]]
+                self.edge_amaf_visits[new_first:new_first + count] = edge_amaf_visits[first:first + count]
+                self.edge_amaf_reward[new_first:new_first + count] = edge_amaf_reward[first:first + count]
+
+        if transposition is not None:
+            transposition.remap(mapping)
+        return 0
+
+    def prune(self, root, target, transposition=None):
+        """
+        Shrink the tree below root to at most `target` nodes, keeping the most visited part.
+
+        Nodes are expanded best-first by visit count from the root until the
+        next expansion would exceed the target. Kept nodes that were not
+        expanded become leaves again; their own statistics already include
+        everything below them, so only the detail of their subtrees is lost.
+        The tree is then compacted (see `compact`).
+
+        Returns:
+            (new root ID, number of nodes removed)
+        """
+        before = len(self)
+        visits = self.visits
+        edge_child = self.edge_child
+        kept = {root}
+        expanded = set()
+        frontier = [(-visits[root], root)]
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            first = self.first_child[node]
+            children = [child for child in edge_child[first:first + self.child_count[node]]
+                        if child != NO_NODE and child not in kept]
+            if len(kept) + len(children) > target:
+                break
+            expanded.add(node)
+            kept.update(children)
+            for child in children:
+                if self.child_count[child]:
+                    heapq.heappush(frontier, (-visits[child], child))
+
+        for node in kept:
+            if node not in expanded:
+                self.child_count[node] = 0
+                self.tried[node] = 0
+
+        root = self.compact(root, transposition)
+        return root, before - len(self)
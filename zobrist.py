@@ -0,0 +1,41 @@
+import random
+
+from config import BOARD_SIZE, BLACK_TILE, WHITE_TILE
+
+# Fixed seed so that hashes are identical across processes and runs
+_rng = random.Random(0x5EED0F07E110)
+
+# Random 64-bit key per (color, square), indexed by x * BOARD_SIZE + y
+ZOBRIST_SQUARE = {
+    BLACK_TILE: [_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)],
+    WHITE_TILE: [_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)],
+}
+
+# XOR of both color keys: flipping a disc on a square toggles this value
+ZOBRIST_FLIP = [black ^ white for black, white in zip(ZOBRIST_SQUARE[BLACK_TILE], ZOBRIST_SQUARE[WHITE_TILE])]
+
+# Key mixed into a position hash to tell apart which color has just moved
+ZOBRIST_SIDE = {BLACK_TILE: _rng.getrandbits(64), WHITE_TILE: _rng.getrandbits(64)}
+
+
+def hash_grid(grid):
+    """Compute the Zobrist hash of a grid[x][y] of tile characters from scratch."""
+    value = 0
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            keys = ZOBRIST_SQUARE.get(grid[x][y])
+            if keys is not None:
+                value ^= keys[x * BOARD_SIZE + y]
+    return value
+
+
+def hash_bits(black, white):
+    """Compute the Zobrist hash of a pair of black / white bitboards from scratch."""
+    value = 0
+    for color, bits in ((BLACK_TILE, black), (WHITE_TILE, white)):
+        keys = ZOBRIST_SQUARE[color]
+        while bits:
+            low = bits & -bits
+            value ^= keys[low.bit_length() - 1]
+            bits ^= low
+    return value